@@ -0,0 +1,151 @@
+"""
+Benchmark: chunking strategies (see chunking.py) on the ingestion sources.
+
+For each strategy reports index size (vectors, stored characters, vector
+bytes), ingestion throughput (splitting and embedding separately), recall@k
+on the labelled question set and the characters per question that reach the
+LLM graders. A question counts as recalled when any of its expected phrases
+(case-insensitive) appears in that text: the chunk itself, its sentence
+window, or (parent_document) the merged parent spans from the docstore.
+
+Every strategy retrieves the same k chunks per question (ingestion's
+PARENT_CHILD_K over-fetch for parent mode is not applied; pass a larger --k
+to compare at that budget). Each strategy is indexed into a throwaway
+in-memory Chroma collection; the persisted ./.chroma index is not touched.
+
+Examples:
+  python -m benchmarks.chunking
+  python -m benchmarks.chunking --strategies token parent_document --k 4 --json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import tempfile
+import time
+from dataclasses import replace
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from dotenv import load_dotenv
+from langchain_chroma import Chroma
+from langchain_core.documents import Document
+
+from chunking import SOURCE_URLS, STRATEGIES, ChunkConfig, chunk_documents, load_documents
+from docstore import MmapDocStore, expand_to_parent_spans, write_docstore
+from graph.llm import get_embeddings
+
+DEFAULT_QUESTIONS = Path(__file__).with_name("questions.jsonl")
+
+
+def load_labelled_questions(path: Path) -> List[Dict[str, Any]]:
+    rows = []
+    for line in path.read_text(encoding="utf-8").splitlines():
+        if line.strip():
+            row = json.loads(line)
+            if row.get("expected"):
+                rows.append(row)
+    return rows
+
+
+def _graded_texts(docs: List[Document], docstore: Optional[MmapDocStore]) -> List[str]:
+    # Mirrors graph.nodes.retrieve: parent spans or sentence windows
+    if docstore is not None:
+        docs = expand_to_parent_spans(docs, docstore)
+    return [d.metadata.get("window") or d.page_content for d in docs]
+
+
+def recall_at_k(
+    store: Chroma,
+    questions: List[Dict[str, Any]],
+    docstore: Optional[MmapDocStore],
+    k: int,
+) -> Tuple[float, float]:
+    """(recall@k, mean characters handed to the graders per question)."""
+    hits, chars = 0, 0
+    for q in questions:
+        texts = _graded_texts(store.similarity_search(q["question"], k=k), docstore)
+        chars += sum(len(t) for t in texts)
+        text = " ".join(texts).lower()
+        hits += any(phrase.lower() in text for phrase in q["expected"])
+    return hits / len(questions), chars / len(questions)
+
+
+def bench_strategy(
+    docs: List[Document], cfg: ChunkConfig, questions: List[Dict[str, Any]], k: int, embeddings
+) -> Dict[str, Any]:
+    t0 = time.perf_counter()
+    chunks, parent_docs = chunk_documents(docs, cfg)
+    split_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    store = Chroma.from_documents(
+        documents=chunks,
+        collection_name=f"bench-{cfg.strategy}-{int(time.time())}",
+        embedding=embeddings,
+    )
+    embed_s = time.perf_counter() - t0
+
+    dim = len(embeddings.embed_query("dimension probe"))
+    with tempfile.TemporaryDirectory() as tmp:
+        docstore = None
+        if parent_docs:
+            write_docstore(tmp, parent_docs)
+            docstore = MmapDocStore(tmp)
+        # Same retrieval budget for every strategy; parent mode then merges
+        # its k children into spans
+        recall, graded_chars = recall_at_k(store, questions, docstore, k)
+        if docstore is not None:
+            docstore.close()
+    store.delete_collection()
+
+    return {
+        "strategy": cfg.strategy,
+        "vectors": len(chunks),
+        "parents": len(parent_docs),
+        "indexed_chars": sum(len(c.page_content) for c in chunks),
+        "vector_bytes": len(chunks) * dim * 4,
+        "split_s": round(split_s, 3),
+        "split_docs_per_s": round(len(docs) / split_s, 1) if split_s else None,
+        "embed_s": round(embed_s, 3),
+        "embed_chunks_per_s": round(len(chunks) / embed_s, 1) if embed_s else None,
+        f"recall@{k}": round(recall, 3),
+        "graded_chars_per_question": round(graded_chars),
+    }
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    p = argparse.ArgumentParser(description="Benchmark chunking strategies.")
+    p.add_argument("--strategies", nargs="+", choices=STRATEGIES,
+                   default=list(STRATEGIES), help="Strategies to compare.")
+    p.add_argument("--questions", type=Path, default=DEFAULT_QUESTIONS,
+                   help="JSONL with {\"question\": ..., \"expected\": [...]} per line.")
+    p.add_argument("--k", type=int, default=4, help="Top-k for recall@k.")
+    p.add_argument("--workers", type=int, default=0,
+                   help="Process pool size for splitting (0 = CPU count).")
+    p.add_argument("--json", dest="as_json", action="store_true",
+                   help="Print the results as JSON.")
+    args = p.parse_args(argv)
+
+    load_dotenv()
+    base_cfg = replace(ChunkConfig.from_env(), workers=args.workers)
+    questions = load_labelled_questions(args.questions)
+    embeddings = get_embeddings()
+    docs = load_documents(SOURCE_URLS, keep_html="html_heading" in args.strategies)
+
+    results = [
+        bench_strategy(docs, replace(base_cfg, strategy=s), questions, args.k, embeddings)
+        for s in args.strategies
+    ]
+
+    if args.as_json:
+        print(json.dumps(results, indent=2))
+    else:
+        for row in results:
+            print(" ".join(f"{key}={value}" for key, value in row.items()))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
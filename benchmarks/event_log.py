@@ -0,0 +1,127 @@
+"""
+Benchmark: per-event cost of graph.events on the request path.
+
+Times N emits of a typical node event (`doc_graded`, two fields) under each
+configuration and reports ns per event on the calling thread, plus the time
+the background writer needs to drain them (not on the request path):
+
+  baseline  an empty function call with the same arguments
+  print     the old synchronous print of one ---STEP--- line (to /dev/null)
+  off       EVENT_LOG=off: emit() returns after a level check
+  filtered  enabled, but the event is below EVENT_LOG_LEVEL
+  null      buffered, discarded by the null sink
+  jsonl     buffered, written as JSON lines to a temporary file
+
+`traced` times a no-op graph node with and without its node_start/node_end
+wrapper.
+
+Examples:
+  python -m benchmarks.event_log
+  python -m benchmarks.event_log --n 1000000 --json
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import json
+import os
+import tempfile
+import time
+from typing import Any, Callable, Dict, Optional
+
+from graph import events
+
+
+def _best_ns_per_call(fn: Callable[[int], None], n: int, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter_ns()
+        fn(n)
+        best = min(best, time.perf_counter_ns() - t0)
+    return best / n
+
+
+def _emit_loop(n: int) -> None:
+    emit = events.emit
+    for i in range(n):
+        emit("doc_graded", events.DEBUG, index=i, relevant=True)
+
+
+def _baseline_loop(n: int) -> None:
+    def noop(event, level=events.INFO, **fields):
+        pass
+
+    for i in range(n):
+        noop("doc_graded", events.DEBUG, index=i, relevant=True)
+
+
+def _print_loop(n: int) -> None:
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for i in range(n):
+            print(f"---DOC {i}: RELEVANT---")
+
+
+def bench_emit(name: str, sinks, level: int, n: int, repeat: int) -> Dict[str, Any]:
+    events.configure(sinks, level=level, buffer_size=n)
+    ns = _best_ns_per_call(_emit_loop, n, repeat)
+    # Drain cost of the last round only (the buffer holds at most n events)
+    t0 = time.perf_counter()
+    events.flush()
+    drain_ms = (time.perf_counter() - t0) * 1000.0
+    events.configure([])
+    return {"mode": name, "ns_per_event": round(ns, 1), "drain_ms": round(drain_ms, 1)}
+
+
+def bench_traced(enabled: bool, n: int, repeat: int) -> Dict[str, Any]:
+    def node(state):
+        return {"documents": state}
+
+    wrapped = events.traced(node)
+    events.configure([events.NullSink()] if enabled else [], buffer_size=2 * n)
+
+    def loop(count: int) -> None:
+        for i in range(count):
+            wrapped(i)
+
+    ns = _best_ns_per_call(loop, n, repeat)
+    events.configure([])
+    return {"mode": f"traced_{'on' if enabled else 'off'}", "ns_per_event": round(ns, 1),
+            "drain_ms": None}
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    p = argparse.ArgumentParser(description="Benchmark the graph event log.")
+    p.add_argument("--n", type=int, default=200_000, help="Events per round.")
+    p.add_argument("--repeat", type=int, default=5,
+                   help="Rounds per mode (the fastest is reported).")
+    p.add_argument("--json", dest="as_json", action="store_true",
+                   help="Print the results as JSON.")
+    args = p.parse_args(argv)
+    n, repeat = args.n, args.repeat
+
+    with tempfile.TemporaryDirectory() as tmp:
+        results = [
+            {"mode": "baseline", "ns_per_event": round(_best_ns_per_call(_baseline_loop, n, repeat), 1),
+             "drain_ms": None},
+            {"mode": "print", "ns_per_event": round(_best_ns_per_call(_print_loop, n, repeat), 1),
+             "drain_ms": None},
+            bench_emit("off", [], events.DEBUG, n, repeat),
+            bench_emit("filtered", [events.NullSink()], events.INFO, n, repeat),
+            bench_emit("null", [events.NullSink()], events.DEBUG, n, repeat),
+            bench_emit("jsonl", [events.JsonlSink(os.path.join(tmp, "events.jsonl"))],
+                       events.DEBUG, n, repeat),
+            bench_traced(False, n, repeat),
+            bench_traced(True, n, repeat),
+        ]
+
+    if args.as_json:
+        print(json.dumps(results, indent=2))
+    else:
+        for row in results:
+            print(" ".join(f"{key}={value}" for key, value in row.items()))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,155 @@
+"""
+Benchmark: two-call generation (generation_chain + answer_grader) versus the
+single-call self-graded generation (SELF_GRADE_MODE).
+
+Reports mean latency and token usage per question for both modes, what the
+single call saves, and how often the self-assessment agrees with the
+answer grader run on the same answer. The single-call figures include the
+answer_grader audits the real mode runs (should_audit: low confidence or the
+SELF_GRADE_AUDIT_RATE sample), and the audit rate is reported.
+
+Examples:
+  python -m benchmarks.self_grade
+  python -m benchmarks.self_grade --questions benchmarks/questions.jsonl --json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from dotenv import load_dotenv
+from langchain_core.callbacks import get_usage_metadata_callback
+
+load_dotenv()
+
+from graph.chains.answer_grader import answer_grader  # noqa: E402
+from graph.chains.generation import generation_chain  # noqa: E402
+from graph.chains.self_graded_generation import (  # noqa: E402
+    self_graded_generation_chain,
+    should_audit,
+    to_self_grade,
+)
+from graph.context import docs_to_context  # noqa: E402
+from ingestion import retriever  # noqa: E402
+
+DEFAULT_QUESTIONS = Path(__file__).with_name("questions.jsonl")
+
+
+def load_questions(path: Path, limit: Optional[int] = None) -> List[str]:
+    questions = []
+    for line in path.read_text(encoding="utf-8").splitlines():
+        if line.strip():
+            questions.append(json.loads(line)["question"])
+    return questions[:limit] if limit else questions
+
+
+def _total_tokens(usage: Dict[str, Any]) -> int:
+    return sum(u.get("total_tokens", 0) for u in usage.values())
+
+
+def run_two_call(question: str, context: str, docs_text: str) -> Dict[str, Any]:
+    with get_usage_metadata_callback() as cb:
+        t0 = time.perf_counter()
+        generation = generation_chain.invoke(
+            {"context": context, "question": question})
+        score = answer_grader.invoke(
+            {"question": question, "documents": docs_text, "generation": generation}
+        )
+        dt_ms = (time.perf_counter() - t0) * 1000.0
+    return {"latency_ms": dt_ms, "tokens": _total_tokens(cb.usage_metadata),
+            "verdict": score.verdict}
+
+
+def run_single_call(question: str, context: str, docs_text: str) -> Dict[str, Any]:
+    with get_usage_metadata_callback() as cb:
+        t0 = time.perf_counter()
+        result = self_graded_generation_chain.invoke(
+            {"context": context, "question": question})
+        dt_ms = (time.perf_counter() - t0) * 1000.0
+        tokens = _total_tokens(cb.usage_metadata)
+
+    self_grade = to_self_grade(result)
+    # Reference verdict for the same answer; only counted in latency/tokens
+    # when the real mode would also have run it (should_audit)
+    with get_usage_metadata_callback() as cb:
+        t0 = time.perf_counter()
+        audit = answer_grader.invoke(
+            {"question": question, "documents": docs_text, "generation": result.answer}
+        )
+        audit_ms = (time.perf_counter() - t0) * 1000.0
+        audit_tokens = _total_tokens(cb.usage_metadata)
+
+    audited = should_audit(self_grade)
+    if audited:
+        dt_ms += audit_ms
+        tokens += audit_tokens
+    return {"latency_ms": dt_ms, "tokens": tokens,
+            "audited": audited,
+            # What grade_generation would act on
+            "verdict": audit.verdict if audited else self_grade["verdict"],
+            "self_verdict": self_grade["verdict"],
+            "confidence": self_grade["confidence"],
+            "grader_verdict": audit.verdict}
+
+
+def summarize(rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+    two = [r["two_call"] for r in rows]
+    one = [r["single_call"] for r in rows]
+    two_ms = statistics.mean(r["latency_ms"] for r in two)
+    one_ms = statistics.mean(r["latency_ms"] for r in one)
+    two_tok = statistics.mean(r["tokens"] for r in two)
+    one_tok = statistics.mean(r["tokens"] for r in one)
+    agree = sum(r["self_verdict"] == r["grader_verdict"] for r in one) / len(one)
+    return {
+        "questions": len(rows),
+        "two_call_latency_ms": round(two_ms, 1),
+        "single_call_latency_ms": round(one_ms, 1),
+        "latency_saved_ms": round(two_ms - one_ms, 1),
+        "two_call_tokens": round(two_tok, 1),
+        "single_call_tokens": round(one_tok, 1),
+        "tokens_saved": round(two_tok - one_tok, 1),
+        "two_call_useful_rate": sum(r["verdict"] == "useful" for r in two) / len(two),
+        "single_call_useful_rate": sum(r["verdict"] == "useful" for r in one) / len(one),
+        "self_grade_agreement": round(agree, 3),
+        "audit_rate": round(sum(r["audited"] for r in one) / len(one), 3),
+    }
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    p = argparse.ArgumentParser(
+        description="Benchmark self-graded generation against generate + answer_grader.")
+    p.add_argument("--questions", type=Path, default=DEFAULT_QUESTIONS,
+                   help="JSONL file with one {\"question\": ...} per line.")
+    p.add_argument("--limit", type=int, default=None,
+                   help="Only run the first N questions.")
+    p.add_argument("--json", dest="as_json", action="store_true",
+                   help="Print per-question rows and the summary as JSON.")
+    args = p.parse_args(argv)
+
+    rows = []
+    for question in load_questions(args.questions, args.limit):
+        docs = retriever.invoke(question)
+        context = docs_to_context(docs)
+        docs_text = "\n\n".join(d.page_content for d in docs)
+        rows.append({
+            "question": question,
+            "two_call": run_two_call(question, context, docs_text),
+            "single_call": run_single_call(question, context, docs_text),
+        })
+
+    summary = summarize(rows)
+    if args.as_json:
+        print(json.dumps({"rows": rows, "summary": summary}, indent=2))
+    else:
+        for key, value in summary.items():
+            print(f"{key:>26}: {value}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
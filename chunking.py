@@ -0,0 +1,211 @@
+"""
+Pluggable chunking strategies for ingestion.
+
+Strategies (CHUNK_STRATEGY):
+  token            token-sized recursive splits (the original behaviour)
+  html_heading     split on h1-h3 first, then token-split each section;
+                   chunks carry their section headings as metadata
+  sentence_window  embed single sentences, keep the surrounding sentences in
+                   metadata["window"] for generation
+  parent_document  small child chunks for matching, each pointing to a large
+                   parent chunk (metadata parent_id/start/end) returned alongside
+
+With workers != 1, documents are split in parallel over a process pool. Only
+enable that (CHUNK_WORKERS) from an entry point with a __main__ guard: under
+the "spawn" start method every worker re-imports the main module.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import List, Tuple
+
+from langchain_classic.text_splitter import (
+    HTMLHeaderTextSplitter,
+    RecursiveCharacterTextSplitter,
+)
+from langchain_core.documents import Document
+
+SOURCE_URLS = [
+    "https://lilianweng.github.io/posts/2023-06-23-agent/",
+    "https://lilianweng.github.io/posts/2023-03-15-prompt-engineering/",
+    "https://lilianweng.github.io/posts/2023-10-25-adv-attack-llm/",
+]
+
+STRATEGIES = ("token", "html_heading", "sentence_window", "parent_document")
+
+HTML_HEADERS = [("h1", "h1"), ("h2", "h2"), ("h3", "h3")]
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+(?=[A-Z0-9\"'(\[])")
+
+
+@dataclass(frozen=True)
+class ChunkConfig:
+    strategy: str = "token"
+    chunk_size: int = 250          # tokens per (child) chunk
+    chunk_overlap: int = 0
+    parent_chunk_size: int = 1000  # tokens per parent (parent_document only)
+    window: int = 2                # sentences on each side (sentence_window only)
+    workers: int = 1               # process pool size; 0 = os.cpu_count(), 1 = in-process
+
+    @classmethod
+    def from_env(cls) -> "ChunkConfig":
+        cfg = cls(
+            strategy=os.getenv("CHUNK_STRATEGY", cls.strategy),
+            chunk_size=int(os.getenv("CHUNK_SIZE", cls.chunk_size)),
+            chunk_overlap=int(os.getenv("CHUNK_OVERLAP", cls.chunk_overlap)),
+            parent_chunk_size=int(
+                os.getenv("CHUNK_PARENT_SIZE", cls.parent_chunk_size)),
+            window=int(os.getenv("CHUNK_WINDOW", cls.window)),
+            workers=int(os.getenv("CHUNK_WORKERS", cls.workers)),
+        )
+        if cfg.strategy not in STRATEGIES:
+            raise ValueError(f"Unknown CHUNK_STRATEGY: {cfg.strategy}")
+        return cfg
+
+
+def load_documents(urls: List[str], keep_html: bool = False) -> List[Document]:
+    """
+    Fetch the source pages. With keep_html the raw page is kept in
+    metadata["html"] for the html_heading strategy (never indexed).
+    """
+    from langchain_community.document_loaders import WebBaseLoader
+
+    if not keep_html:
+        docs = [WebBaseLoader(url).load() for url in urls]
+        return [item for sublist in docs for item in sublist]
+
+    out = []
+    for url in urls:
+        soup = WebBaseLoader(url).scrape()
+        title = soup.find("title")
+        out.append(Document(
+            page_content=soup.get_text(),
+            metadata={
+                "source": url,
+                "title": title.get_text() if title else "",
+                "html": str(soup),
+            },
+        ))
+    return out
+
+
+@lru_cache(maxsize=None)
+def _token_splitter(chunk_size: int, chunk_overlap: int) -> RecursiveCharacterTextSplitter:
+    # Cached per worker process: building the tiktoken encoder is not free
+    return RecursiveCharacterTextSplitter.from_tiktoken_encoder(
+        chunk_size=chunk_size, chunk_overlap=chunk_overlap
+    )
+
+
+def _base_metadata(doc: Document) -> dict:
+    return {k: v for k, v in doc.metadata.items() if k != "html"}
+
+
+def _split_token(doc: Document, cfg: ChunkConfig) -> List[Document]:
+    doc = Document(page_content=doc.page_content, metadata=_base_metadata(doc))
+    return _token_splitter(cfg.chunk_size, cfg.chunk_overlap).split_documents([doc])
+
+
+def _split_html_heading(doc: Document, cfg: ChunkConfig) -> List[Document]:
+    html = doc.metadata.get("html")
+    if not html:
+        return _split_token(doc, cfg)
+    base = _base_metadata(doc)
+    sections = []
+    for section in HTMLHeaderTextSplitter(HTML_HEADERS).split_text(html):
+        # The splitter emits every heading as its own section; the heading
+        # is already in the metadata of the sections below it
+        if section.page_content.strip() in section.metadata.values():
+            continue
+        section.metadata = {**base, **section.metadata}
+        sections.append(section)
+    return _token_splitter(cfg.chunk_size, cfg.chunk_overlap).split_documents(sections)
+
+
+def _split_sentence_window(doc: Document, cfg: ChunkConfig) -> List[Document]:
+    text = re.sub(r"\s+", " ", doc.page_content).strip()
+    sentences = [s for s in _SENTENCE_END.split(text) if s]
+    base = _base_metadata(doc)
+    chunks = []
+    for i, sentence in enumerate(sentences):
+        lo, hi = max(0, i - cfg.window), min(len(sentences), i + cfg.window + 1)
+        chunks.append(Document(
+            page_content=sentence,
+            metadata={**base, "window": " ".join(sentences[lo:hi])},
+        ))
+    return chunks
+
+
+def _parent_id(source: str, index: int) -> str:
+    return hashlib.sha1(f"{source}#{index}".encode()).hexdigest()[:16]
+
+
+def _split_parent_document(doc: Document, cfg: ChunkConfig) -> Tuple[List[Document], List[Document]]:
+    base = _base_metadata(doc)
+    parent_splitter = _token_splitter(cfg.parent_chunk_size, 0)
+    child_splitter = _token_splitter(cfg.chunk_size, cfg.chunk_overlap)
+
+    children, parents = [], []
+    for i, parent_text in enumerate(parent_splitter.split_text(doc.page_content)):
+        parent_id = _parent_id(base.get("source", ""), i)
+        parents.append(Document(
+            page_content=parent_text, metadata={**base, "parent_id": parent_id}))
+        cursor = 0
+        for child_text in child_splitter.split_text(parent_text):
+            start = parent_text.find(child_text, cursor)
+            if start < 0:
+                start = cursor
+            end = start + len(child_text)
+            cursor = start + 1
+            children.append(Document(
+                page_content=child_text,
+                metadata={**base, "parent_id": parent_id,
+                          "start": start, "end": end},
+            ))
+    return children, parents
+
+
+def _chunk_one(doc: Document, cfg: ChunkConfig) -> Tuple[List[Document], List[Document]]:
+    if cfg.strategy == "parent_document":
+        return _split_parent_document(doc, cfg)
+    if cfg.strategy == "html_heading":
+        return _split_html_heading(doc, cfg), []
+    if cfg.strategy == "sentence_window":
+        return _split_sentence_window(doc, cfg), []
+    return _split_token(doc, cfg), []
+
+
+def assign_chunk_ids(chunks: List[Document]) -> List[Document]:
+    """
+    Give every chunk a deterministic id (source, position and content), so
+    re-indexing identical content yields identical vector-store ids.
+    """
+    for i, chunk in enumerate(chunks):
+        key = f"{chunk.metadata.get('source', '')}#{i}#{chunk.page_content}"
+        chunk.id = hashlib.sha1(key.encode("utf-8")).hexdigest()
+    return chunks
+
+
+def chunk_documents(
+    docs: List[Document], cfg: ChunkConfig
+) -> Tuple[List[Document], List[Document]]:
+    """
+    Split `docs` with cfg.strategy. Returns (chunks to index, parent documents);
+    parents are only produced by the parent_document strategy.
+    """
+    workers = cfg.workers or os.cpu_count() or 1
+    workers = min(workers, len(docs))
+    if workers <= 1:
+        results = [_chunk_one(d, cfg) for d in docs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_chunk_one, docs, [cfg] * len(docs)))
+
+    chunks = [c for doc_chunks, _ in results for c in doc_chunks]
+    parents = [p for _, doc_parents in results for p in doc_parents]
+    return chunks, parents
@@ -0,0 +1,140 @@
+"""
+Compact, memory-mapped parent docstore for small-to-big retrieval.
+
+Parents are stored as one UTF-8 blob (parents.bin) plus an index
+(parents.idx.json) of id -> [byte offset, byte length, metadata]. Reads mmap
+the blob, so a lookup touches only the pages of the requested parent and the
+store costs no heap beyond the index.
+"""
+
+from __future__ import annotations
+
+import json
+import mmap
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from langchain_core.documents import Document
+
+BLOB_NAME = "parents.bin"
+INDEX_NAME = "parents.idx.json"
+
+
+def write_docstore(directory: str | Path, parents: List[Document]) -> None:
+    """(Re)write the store from parent documents keyed by metadata["parent_id"]."""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    index: Dict[str, list] = {}
+    blob_tmp = directory / (BLOB_NAME + ".tmp")
+    with blob_tmp.open("wb") as f:
+        offset = 0
+        for p in parents:
+            data = p.page_content.encode("utf-8")
+            meta = {k: v for k, v in p.metadata.items() if k != "parent_id"}
+            index[p.metadata["parent_id"]] = [offset, len(data), meta]
+            f.write(data)
+            offset += len(data)
+    index_tmp = directory / (INDEX_NAME + ".tmp")
+    index_tmp.write_text(json.dumps(index), encoding="utf-8")
+    # Swap both files in only once fully written
+    os.replace(blob_tmp, directory / BLOB_NAME)
+    os.replace(index_tmp, directory / INDEX_NAME)
+
+
+class MmapDocStore:
+    def __init__(self, directory: str | Path) -> None:
+        directory = Path(directory)
+        self._index = json.loads(
+            (directory / INDEX_NAME).read_text(encoding="utf-8"))
+        self._file = (directory / BLOB_NAME).open("rb")
+        size = os.fstat(self._file.fileno()).st_size
+        # mmap refuses empty files
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, parent_id: str) -> bool:
+        return parent_id in self._index
+
+    def get_text(self, parent_id: str) -> Optional[str]:
+        entry = self._index.get(parent_id)
+        if entry is None or self._mm is None:
+            return None
+        offset, length, _ = entry
+        return self._mm[offset:offset + length].decode("utf-8")
+
+    def get(self, parent_id: str) -> Optional[Document]:
+        text = self.get_text(parent_id)
+        if text is None:
+            return None
+        meta = {**self._index[parent_id][2], "parent_id": parent_id}
+        return Document(page_content=text, metadata=meta)
+
+    def close(self) -> None:
+        if self._mm is not None:
+            self._mm.close()
+        self._file.close()
+
+
+def _group(
+    spans: List[Tuple[int, int, int]], padding: int, max_chars: int
+) -> List[Tuple[int, int, int]]:
+    # (start, end, rank) child spans -> groups of nearby children whose
+    # covering span stays within max_chars; a group keeps its best rank
+    groups: List[Tuple[int, int, int]] = []
+    for start, end, rank in sorted(spans):
+        if groups:
+            g_start, g_end, g_rank = groups[-1]
+            if start - g_end <= 2 * padding and max(end, g_end) - g_start <= max_chars:
+                groups[-1] = (g_start, max(end, g_end), min(rank, g_rank))
+                continue
+        groups.append((start, end, rank))
+    return groups
+
+
+def expand_to_parent_spans(
+    children: List[Document],
+    store: MmapDocStore,
+    padding: int = 400,
+    max_spans: int = 4,
+    max_chars: int = 1500,
+) -> List[Document]:
+    """
+    Replace retrieved child chunks by their parent text. Nearby children of
+    the same parent are grouped while the group fits in `max_chars`; each
+    group is padded by up to `padding` chars per side, as far as `max_chars`
+    allows, and never cut, so every child's own text is kept. Spans are
+    ordered by the rank of their best child and at most `max_spans` are
+    returned. Children without a known parent are passed through unchanged.
+    """
+    by_parent: Dict[str, List[Tuple[int, int, int]]] = {}
+    ranked: List[Tuple[int, Document]] = []
+    for rank, child in enumerate(children):
+        parent_id = child.metadata.get("parent_id")
+        if parent_id not in store:
+            ranked.append((rank, child))
+            continue
+        by_parent.setdefault(parent_id, []).append(
+            (child.metadata.get("start", 0), child.metadata.get("end", 0), rank))
+
+    for parent_id, spans in by_parent.items():
+        parent = store.get(parent_id)
+        text = parent.page_content
+        prev_end = 0
+        for start, end, rank in _group(spans, padding, max_chars):
+            budget = max(0, max_chars - (end - start))
+            left = min(padding, budget // 2, start)
+            right = min(padding, budget - left, len(text) - end)
+            # Don't repeat text already in the previous span of this parent
+            span_start = max(start - left, min(prev_end, start))
+            span_end = end + right
+            prev_end = span_end
+            ranked.append((rank, Document(
+                page_content=text[span_start:span_end],
+                metadata={**parent.metadata, "start": span_start, "end": span_end},
+            )))
+
+    ranked.sort(key=lambda item: item[0])
+    return [doc for _, doc in ranked[:max_spans]]
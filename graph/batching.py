@@ -0,0 +1,92 @@
+import asyncio
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, List, Tuple
+
+from langchain_core.runnables import Runnable, RunnableLambda
+
+# OLLAMA_MICROBATCH=on coalesces concurrent grader calls (from concurrent
+# requests) into one runnable.batch() so the Ollama server schedules them
+# together (up to OLLAMA_NUM_PARALLEL server-side) instead of one by one.
+MICROBATCH_ENABLED = os.getenv("OLLAMA_MICROBATCH", "off").lower() in (
+    "1", "true", "on")
+MICROBATCH_MAX_SIZE = int(os.getenv("OLLAMA_MICROBATCH_MAX_SIZE", "8"))
+MICROBATCH_MAX_WAIT_MS = float(os.getenv("OLLAMA_MICROBATCH_MAX_WAIT_MS", "10"))
+
+
+class MicroBatcher:
+    """
+    Collects invoke() calls arriving within max_wait_ms of each other (up to
+    max_batch_size) and runs them as a single runnable.batch() call.
+    """
+
+    def __init__(
+        self,
+        runnable: Runnable,
+        max_batch_size: int = MICROBATCH_MAX_SIZE,
+        max_wait_ms: float = MICROBATCH_MAX_WAIT_MS,
+    ) -> None:
+        self.runnable = runnable
+        self.max_batch_size = max_batch_size
+        self.max_wait_s = max_wait_ms / 1000.0
+        self._queue: "queue.Queue[Tuple[Any, Future]]" = queue.Queue()
+        self._worker = threading.Thread(
+            target=self._run, name="microbatcher", daemon=True)
+        self._worker.start()
+
+    def submit(self, payload: Any) -> Future:
+        future: Future = Future()
+        self._queue.put((payload, future))
+        return future
+
+    def invoke(self, payload: Any) -> Any:
+        return self.submit(payload).result()
+
+    async def ainvoke(self, payload: Any) -> Any:
+        # Cancelling the awaiting task cancels the queued item too
+        return await asyncio.wrap_future(self.submit(payload))
+
+    def as_runnable(self) -> Runnable:
+        return RunnableLambda(self.invoke, afunc=self.ainvoke)
+
+    def _collect(self) -> List[Tuple[Any, Future]]:
+        items = [self._queue.get()]
+        window_ends = time.monotonic() + self.max_wait_s
+        while len(items) < self.max_batch_size:
+            timeout = window_ends - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                items.append(self._queue.get(timeout=timeout))
+            except queue.Empty:
+                break
+        # Drop calls whose caller already gave up (deadline cancellation)
+        return [(p, f) for p, f in items if f.set_running_or_notify_cancel()]
+
+    def _run(self) -> None:
+        while True:
+            items = self._collect()
+            if not items:
+                continue
+            try:
+                results = self.runnable.batch(
+                    [p for p, _ in items], return_exceptions=True)
+            except Exception as e:
+                results = [e] * len(items)
+            for (_, future), result in zip(items, results):
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+
+
+def maybe_microbatch(runnable: Runnable) -> Runnable:
+    """Wrap `runnable` in a MicroBatcher when Ollama micro-batching is on."""
+    if not MICROBATCH_ENABLED:
+        return runnable
+    if os.getenv("LLM_PROVIDER", "gemini").lower() != "ollama":
+        return runnable
+    return MicroBatcher(runnable).as_runnable()
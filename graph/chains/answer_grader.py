@@ -1,7 +1,8 @@
-from graph.llm import get_chat_llm
-from langchain_core.prompts import ChatPromptTemplate
+from graph.batching import maybe_microbatch
+from graph.llm import get_structured_llm
+from graph.prompt_registry import get_prompt
 from pydantic import BaseModel, Field
-from langchain_core.runnables import RunnableSequence
+from langchain_core.runnables import Runnable
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -22,41 +23,8 @@ class GradeAnswer(BaseModel):
     )
 
 
-llm = get_chat_llm(temperature=0.0, max_output_tokens=200)
+structured_llm_grader = get_structured_llm("answer_grader", GradeAnswer)
 
-structured_llm_grader = llm.with_structured_output(GradeAnswer)
+answer_prompt = get_prompt("answer_grader")
 
-system = """You are a strict grader.
-
-You receive:
-1) A user question
-2) Retrieved documents (facts)
-3) A generated answer
-
-Tasks:
-A) Decide if the answer is grounded in the documents (no unsupported claims).
-B) Decide if the answer answers the question.
-
-Return:
-- grounded (bool)
-- answers_question (bool)
-- verdict:
-  - "useful" if grounded=True AND answers_question=True
-  - "not_useful" if grounded=True AND answers_question=False
-  - "not_supported" if grounded=False
-- reason: short justification
-"""
-
-answer_prompt = ChatPromptTemplate.from_messages(
-    [
-        ("system", system),
-        (
-            "human",
-            "User question:\n{question}\n\n"
-            "Retrieved documents:\n{documents}\n\n"
-            "LLM generation:\n{generation}"
-        ),
-    ]
-)
-
-answer_grader: RunnableSequence = answer_prompt | structured_llm_grader
+answer_grader: Runnable = maybe_microbatch(answer_prompt | structured_llm_grader)
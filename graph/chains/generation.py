@@ -1,31 +1,17 @@
 from graph.llm import get_chat_llm
-import os
-from langchain_classic import hub
+from graph.prompt_registry import get_prompt
 from langchain_core.output_parsers import StrOutputParser
-from langchain_core.prompts import ChatPromptTemplate
 from dotenv import load_dotenv
 
 load_dotenv()
 
-llm = get_chat_llm(temperature=0.0, max_output_tokens=200)
-base_prompt = hub.pull("rlm/rag-prompt")
+llm = get_chat_llm("generator")
 
-# Wrap the original prompt output with hard constraints
-short_wrapper = ChatPromptTemplate.from_messages(
-    [
-        (
-            "system",
-            "You are a concise RAG assistant.\n"
-            "Rules:\n"
-            "- Answer in 2-4 sentences.\n"
-            "- Max 80 words.\n"
-            "- No bullet points, no numbered lists.\n"
-            "- No preamble (no 'Sure', no 'Here is').\n"
-            "- If the context does not support an answer, say: "
-            "'I don't know based on the provided context.'\n",
-        ),
-        ("human", "{input}"),
-    ]
-)
+# Vendored, flattened rag-prompt + short-answer rules (graph/prompts/generation)
+prompt = get_prompt("generation")
 
-generation_chain = base_prompt | short_wrapper | llm | StrOutputParser()
+generation_chain = prompt | llm | StrOutputParser()
+
+# "regenerate" retries: previous answer + grader feedback, widened context
+# (graph.context.generation_inputs)
+generation_retry_chain = get_prompt("generation_retry") | llm | StrOutputParser()
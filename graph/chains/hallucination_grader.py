@@ -1,5 +1,5 @@
-from graph.llm import get_chat_llm
-from langchain_core.prompts import ChatPromptTemplate
+from graph.llm import get_structured_llm
+from graph.prompt_registry import get_prompt
 from pydantic import BaseModel, Field
 from langchain_core.runnables import RunnableSequence
 import os
@@ -7,8 +7,6 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
-llm = get_chat_llm(temperature=0.0, max_output_tokens=200)
-
 
 class GradeHallucinations(BaseModel):
     """Binary score for hallucination present in generation answer."""
@@ -18,16 +16,9 @@ class GradeHallucinations(BaseModel):
     )
 
 
-structured_llm_grader = llm.with_structured_output(GradeHallucinations)
+structured_llm_grader = get_structured_llm(
+    "hallucination_grader", GradeHallucinations)
 
-system = """You are a grader assessing whether an LLM generation is grounded in / supported by a set of retrieved facts. \n
-     Give a binary score 'yes' or 'no'. 'Yes' means that the answer is grounded in / supported by the set of facts."""
-hallucination_prompt = ChatPromptTemplate.from_messages(
-    [
-        ("system", system),
-        ("human",
-         "Set of facts: \n\n {documents} \n\n LLM generation: {generation}"),
-    ]
-)
+hallucination_prompt = get_prompt("hallucination_grader")
 
 hallucination_grader: RunnableSequence = hallucination_prompt | structured_llm_grader
@@ -1,5 +1,6 @@
-from graph.llm import get_chat_llm
-from langchain_core.prompts import ChatPromptTemplate
+from graph.batching import maybe_microbatch
+from graph.llm import get_structured_llm
+from graph.prompt_registry import get_prompt
 from pydantic import BaseModel, Field
 import os
 from dotenv import load_dotenv
@@ -7,8 +8,6 @@ from typing import List
 
 load_dotenv()
 
-llm = get_chat_llm(temperature=0.0, max_output_tokens=200)
-
 
 class DocGrade(BaseModel):
     """Grade for a single document."""
@@ -24,28 +23,9 @@ class GradeDocuments(BaseModel):
         description="A grade for every provided document index.")
 
 
-structured_llm_grader = llm.with_structured_output(GradeDocuments)
-
-system = """You are a strict grader assessing relevance of multiple retrieved documents to a user question.
-
-Rules:
-- You MUST return a grade for EVERY document index you receive.
-- relevant=True if the document contains keywords OR semantic meaning that helps answer the question.
-- relevant=False otherwise.
-- Do not skip any indices.
-"""
+structured_llm_grader = get_structured_llm("doc_grader", GradeDocuments)
 
-grade_prompt = ChatPromptTemplate.from_messages(
-    [
-        ("system", system),
-        (
-            "human",
-            "User question:\n{question}\n\n"
-            "Retrieved documents (each has an index):\n{documents}\n\n"
-            "Return grades for ALL indices."
-        ),
-    ]
-)
+grade_prompt = get_prompt("retrieval_grader")
 
 # Keep the same export name so you don't need to change imports elsewhere.
-retrieval_grader = grade_prompt | structured_llm_grader
+retrieval_grader = maybe_microbatch(grade_prompt | structured_llm_grader)
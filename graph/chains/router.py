@@ -1,9 +1,9 @@
 from typing import Literal
 
-from langchain_core.prompts import ChatPromptTemplate
 from pydantic import BaseModel, Field
 import os
-from graph.llm import get_chat_llm
+from graph.llm import get_structured_llm
+from graph.prompt_registry import get_prompt
 
 
 class RouteQuery(BaseModel):
@@ -15,18 +15,8 @@ class RouteQuery(BaseModel):
     )
 
 
-llm = get_chat_llm(temperature=0.0, max_output_tokens=200)
-structured_llm_router = llm.with_structured_output(RouteQuery)
+structured_llm_router = get_structured_llm("router", RouteQuery)
 
-system = """You are an expert at routing a user question to a vectorstore or web search.
-The vectorstore contains documents related to agents, prompt engineering, and adversarial attacks.
-Use the vectorstore for questions on these topics. For all else, use web-search."""
-
-route_prompt = ChatPromptTemplate.from_messages(
-    [
-        ('system', system),
-        ('human', '{question}')
-    ]
-)
+route_prompt = get_prompt("router")
 
 question_router = route_prompt | structured_llm_router
@@ -0,0 +1,78 @@
+import os
+import random
+from typing import Any, Dict
+
+from graph.llm import get_structured_llm
+from graph.prompt_registry import get_prompt
+from pydantic import BaseModel, Field
+from langchain_core.runnables import RunnableSequence
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# SELF_GRADE_MODE=on folds the answer grader into generation: one structured
+# call returns the answer plus a self-assessment. The standalone answer_grader
+# then only runs on a sampled (SELF_GRADE_AUDIT_RATE) or low-confidence
+# (< SELF_GRADE_MIN_CONFIDENCE) fraction of generations.
+SELF_GRADE_ENABLED = os.getenv("SELF_GRADE_MODE", "off").lower() in (
+    "1", "true", "on")
+SELF_GRADE_AUDIT_RATE = float(os.getenv("SELF_GRADE_AUDIT_RATE", "0.1"))
+SELF_GRADE_MIN_CONFIDENCE = float(
+    os.getenv("SELF_GRADE_MIN_CONFIDENCE", "0.7"))
+
+
+class GradedGeneration(BaseModel):
+    """Answer together with the generator's own grounding assessment."""
+
+    answer: str = Field(
+        description="The answer to the user question (2-4 sentences, max 80 words)."
+    )
+    grounded: bool = Field(
+        description="True if every claim in the answer is supported by the context."
+    )
+    answers_question: bool = Field(
+        description="True if the answer addresses/resolves the user question."
+    )
+    confidence: float = Field(
+        description="Confidence in the two assessments above, from 0.0 to 1.0."
+    )
+
+
+# Room for the 80-word answer plus the JSON envelope around it.
+structured_llm_generator = get_structured_llm(
+    "generator", GradedGeneration, max_output_tokens=300)
+
+self_graded_prompt = get_prompt("self_graded_generation")
+
+self_graded_generation_chain: RunnableSequence = (
+    self_graded_prompt | structured_llm_generator
+)
+
+# "regenerate" retries: previous answer + grader feedback, widened context
+# (graph.context.generation_inputs)
+self_graded_generation_retry_chain: RunnableSequence = (
+    get_prompt("self_graded_generation_retry") | structured_llm_generator
+)
+
+
+def verdict_from_grade(grounded: bool, answers_question: bool) -> str:
+    # Same mapping the answer grader is instructed to apply.
+    if not grounded:
+        return "not_supported"
+    return "useful" if answers_question else "not_useful"
+
+
+def to_self_grade(result: GradedGeneration) -> Dict[str, Any]:
+    return {
+        "grounded": result.grounded,
+        "answers_question": result.answers_question,
+        "confidence": result.confidence,
+        "verdict": verdict_from_grade(result.grounded, result.answers_question),
+    }
+
+
+def should_audit(self_grade: Dict[str, Any]) -> bool:
+    """True if the self-assessment must be double-checked by answer_grader."""
+    if self_grade.get("confidence", 0.0) < SELF_GRADE_MIN_CONFIDENCE:
+        return True
+    return random.random() < SELF_GRADE_AUDIT_RATE
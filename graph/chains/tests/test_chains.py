@@ -5,6 +5,7 @@ from dotenv import load_dotenv
 from graph.chains.generation import generation_chain
 from pprint import pprint
 from graph.chains.router import question_router, RouteQuery
+from graph.chains.self_graded_generation import GradedGeneration, self_graded_generation_chain
 
 load_dotenv()
 
@@ -68,6 +69,17 @@ def test_hallucination_grader_answer_no() -> None:
     assert not res.binary_score
 
 
+def test_self_graded_generation_grounded() -> None:
+    question = "agent memory"
+    docs = retriever.invoke(question)
+    context = "\n\n".join(d.page_content for d in docs)
+
+    res: GradedGeneration = self_graded_generation_chain.invoke(
+        {"context": context, "question": question})
+    assert res.answer
+    assert res.grounded
+
+
 def test_router_to_vectorstore() -> None:
     question = "agent_memory"
     res: RouteQuery = question_router.invoke({"question": question})
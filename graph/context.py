@@ -0,0 +1,57 @@
+from typing import Any, Dict, List
+
+from langchain_core.documents import Document
+
+from graph.retry import REGENERATE
+from graph.state import GraphState
+
+MAX_DOCS = 4
+MAX_CHARS_PER_DOC = 1500  # keep prompts small
+RETRY_CONTEXT_MULTIPLIER = 2  # a "regenerate" retry gets a larger context
+
+DEFAULT_FEEDBACK = "The previous answer made claims the context does not support."
+
+
+def docs_to_context(
+    docs: List[Document],
+    max_docs: int = MAX_DOCS,
+    max_chars_per_doc: int = MAX_CHARS_PER_DOC,
+) -> str:
+    cleaned: List[str] = []
+    for d in docs[:max_docs]:
+        if not isinstance(d, Document):
+            continue  # ignore poisoned entries
+        src = d.metadata.get("source") or d.metadata.get("url") or ""
+        text = (d.page_content or "").strip()
+        if not text:
+            continue
+        text = text[:max_chars_per_doc]
+        cleaned.append(f"SOURCE: {src}\n{text}")
+    return "\n\n".join(cleaned)
+
+
+def generation_inputs(state: GraphState) -> Dict[str, Any]:
+    """
+    Prompt inputs for the next generation attempt.
+
+    A "regenerate" retry must not resend the failed prompt: it widens the
+    context with the documents grade_documents filtered out (and larger
+    per-document caps), and adds the previous answer plus the grader's
+    feedback for the generation_retry prompt.
+    """
+    documents = state.get("documents") or []
+    inputs: Dict[str, Any] = {"question": state["question"]}
+    if state.get("retry_strategy") != REGENERATE:
+        inputs["context"] = docs_to_context(documents)
+        return inputs
+
+    widened = documents + [
+        d for d in state.get("dropped_documents") or [] if d not in documents]
+    inputs["context"] = docs_to_context(
+        widened,
+        max_docs=MAX_DOCS * RETRY_CONTEXT_MULTIPLIER,
+        max_chars_per_doc=MAX_CHARS_PER_DOC * RETRY_CONTEXT_MULTIPLIER,
+    )
+    inputs["previous_answer"] = state.get("generation") or ""
+    inputs["feedback"] = state.get("generation_feedback") or DEFAULT_FEEDBACK
+    return inputs
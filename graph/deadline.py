@@ -0,0 +1,113 @@
+import asyncio
+import concurrent.futures
+import functools
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from graph import events
+from graph.state import GraphState
+
+# Conditional-edge value used to end the run once the deadline has passed
+DEADLINE_EXCEEDED = "deadline_exceeded"
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when a request's deadline passes before a call completes."""
+
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_lock = threading.Lock()
+
+
+def _background_loop() -> asyncio.AbstractEventLoop:
+    # One long-lived loop: async clients keep their connection pools across
+    # calls, and a call that overruns its deadline can be cancelled in-flight.
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(
+                target=_loop.run_forever, name="deadline-loop", daemon=True
+            ).start()
+    return _loop
+
+
+def time_left(deadline: Optional[float]) -> Optional[float]:
+    """Seconds until `deadline` (a time.time() timestamp), or None if unset."""
+    if deadline is None:
+        return None
+    return deadline - time.time()
+
+
+def check_deadline(deadline: Optional[float]) -> None:
+    remaining = time_left(deadline)
+    if remaining is not None and remaining <= 0:
+        raise DeadlineExceeded("Request deadline exceeded")
+
+
+def sleep_within_deadline(seconds: float, deadline: Optional[float]) -> None:
+    # Don't sleep past the deadline just to fail afterwards
+    remaining = time_left(deadline)
+    if remaining is not None and seconds >= remaining:
+        raise DeadlineExceeded(
+            f"Backoff of {seconds:.1f}s exceeds remaining {remaining:.1f}s")
+    time.sleep(seconds)
+
+
+def invoke_with_deadline(runnable, payload, deadline: Optional[float]):
+    """
+    runnable.invoke(payload), bounded by `deadline`.
+
+    Without a deadline this is a plain synchronous invoke. With one, the call
+    runs as ainvoke() on the background loop and is cancelled (aborting the
+    underlying HTTP request) when the deadline passes.
+    """
+    remaining = time_left(deadline)
+    if remaining is None:
+        return runnable.invoke(payload)
+    if remaining <= 0:
+        raise DeadlineExceeded("Request deadline exceeded")
+
+    future = asyncio.run_coroutine_threadsafe(
+        runnable.ainvoke(payload), _background_loop())
+    try:
+        return future.result(timeout=remaining)
+    except concurrent.futures.TimeoutError:
+        future.cancel()
+        raise DeadlineExceeded(
+            f"Call to {type(runnable).__name__} cancelled at deadline") from None
+
+
+def mark_partial(state: GraphState) -> Dict[str, Any]:
+    """
+    Graph node for a deadline that passes in a conditional edge (routing):
+    edges cannot update state, so the run is flagged partial here.
+    """
+    events.emit("deadline_exceeded", events.WARNING, node="mark_partial")
+    return {"partial": True}
+
+
+def deadline_guard(
+    node: Callable[[GraphState], Dict[str, Any]]
+) -> Callable[[GraphState], Dict[str, Any]]:
+    """
+    Wraps a graph node so it is skipped once the deadline has passed and a
+    DeadlineExceeded inside it marks the run as partial instead of failing.
+    Whatever generation is already in the state is kept as the best answer.
+    """
+
+    @functools.wraps(node)
+    def wrapper(state: GraphState) -> Dict[str, Any]:
+        if state.get("partial"):
+            events.emit("node_skipped", events.WARNING,
+                        node=node.__name__, reason="deadline_exceeded")
+            return {}
+        try:
+            check_deadline(state.get("deadline"))
+            return node(state)
+        except DeadlineExceeded:
+            events.emit("deadline_exceeded", events.WARNING, node=node.__name__)
+            return {"partial": True}
+
+    return wrapper
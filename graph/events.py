@@ -0,0 +1,308 @@
+"""
+Structured event log for graph nodes and edges.
+
+emit() only appends a tuple to an in-memory ring buffer; a background thread
+formats the events and hands them to the configured sinks in batches, so no
+I/O happens on the request path. Events carry the run id bound by
+run_context(), so concurrent runs can be told apart.
+
+  EVENT_LOG        comma-separated sinks: console (default), jsonl, otel, null,
+                   or off (emit() returns after one integer comparison)
+  EVENT_LOG_LEVEL  debug | info (default) | warning | error
+  EVENT_LOG_PATH   jsonl target file, "-" for stderr (default)
+  EVENT_LOG_BUFFER ring buffer size (default 10000); when full, the oldest
+                   events are dropped rather than blocking the caller
+
+The otel sink turns runs and nodes into OpenTelemetry spans and every other
+event into a span event; configure the SDK/exporter as usual
+(opentelemetry-api is a chromadb dependency, the SDK is not).
+"""
+
+from __future__ import annotations
+
+import atexit
+import contextlib
+import contextvars
+import functools
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import deque
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+DEBUG = logging.DEBUG
+INFO = logging.INFO
+WARNING = logging.WARNING
+ERROR = logging.ERROR
+OFF = logging.CRITICAL + 10
+
+EVENT_LOG = os.getenv("EVENT_LOG", "console").lower()
+EVENT_LOG_LEVEL = os.getenv("EVENT_LOG_LEVEL", "info").upper()
+EVENT_LOG_PATH = os.getenv("EVENT_LOG_PATH", "-")
+EVENT_LOG_BUFFER = int(os.getenv("EVENT_LOG_BUFFER", "10000"))
+_FLUSH_INTERVAL_S = 0.05
+
+Record = Dict[str, Any]
+_Entry = Tuple[float, int, Optional[str], str, Dict[str, Any]]
+
+_run_id: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar(
+    "event_run_id", default=None)
+
+
+# --------------------------------------------------------------------- sinks
+
+class NullSink:
+    """Accepts and discards events (measures the emitter on its own)."""
+
+    def write(self, records: List[Record]) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+class JsonlSink:
+    def __init__(self, path: str = EVENT_LOG_PATH) -> None:
+        self._owned = path != "-"
+        self._out = open(path, "a", encoding="utf-8") if self._owned else sys.stderr
+
+    def write(self, records: List[Record]) -> None:
+        self._out.write("".join(
+            json.dumps(r, ensure_ascii=False, default=str) + "\n" for r in records))
+        self._out.flush()
+
+    def close(self) -> None:
+        if self._owned:
+            self._out.close()
+
+
+class ConsoleSink:
+    """Human-readable lines on stderr (stdout stays free for the answer)."""
+
+    def write(self, records: List[Record]) -> None:
+        lines = []
+        for r in records:
+            r = dict(r)
+            ts = time.strftime("%H:%M:%S", time.localtime(r.pop("ts")))
+            level = r.pop("level").upper()
+            run = (r.pop("run_id") or "-")[:8]
+            event = r.pop("event")
+            fields = " ".join(f"{k}={v}" for k, v in r.items())
+            lines.append(f"{ts} {level:<7} [{run}] {event} {fields}".rstrip() + "\n")
+        sys.stderr.write("".join(lines))
+        sys.stderr.flush()
+
+    def close(self) -> None:
+        pass
+
+
+def _otel_attributes(fields: Record) -> Dict[str, Any]:
+    return {k: v if isinstance(v, (str, bool, int, float)) else str(v)
+            for k, v in fields.items() if v is not None}
+
+
+class OtelSink:
+    """
+    One span per run (run_start .. run_end) with a child span per node
+    (from node_end and its duration); other events become span events.
+    """
+
+    def __init__(self) -> None:
+        from opentelemetry import trace
+
+        self._trace = trace
+        self._tracer = trace.get_tracer("agentic_rag.events")
+        self._runs: Dict[str, Any] = {}
+
+    def write(self, records: List[Record]) -> None:
+        for r in records:
+            r = dict(r)
+            ts_ns = int(r.pop("ts") * 1e9)
+            run_id = r.get("run_id")
+            event = r.pop("event")
+            root = self._runs.get(run_id)
+            parent = self._trace.set_span_in_context(root) if root else None
+
+            if event == "run_start":
+                self._runs[run_id] = self._tracer.start_span(
+                    "rag.run", start_time=ts_ns, attributes=_otel_attributes(r))
+            elif event == "run_end" and root is not None:
+                root.set_attributes(_otel_attributes(r))
+                root.end(end_time=ts_ns)
+                del self._runs[run_id]
+            elif event == "node_start":
+                continue  # the node span is created from node_end
+            elif event == "node_end":
+                start_ns = ts_ns - int(r.get("duration_ms", 0) * 1e6)
+                span = self._tracer.start_span(
+                    f"rag.node.{r.get('node')}", context=parent,
+                    start_time=start_ns, attributes=_otel_attributes(r))
+                span.end(end_time=ts_ns)
+            elif root is not None:
+                root.add_event(event, _otel_attributes(r), timestamp=ts_ns)
+            else:
+                span = self._tracer.start_span(
+                    event, start_time=ts_ns, attributes=_otel_attributes(r))
+                span.end(end_time=ts_ns)
+
+    def close(self) -> None:
+        for span in self._runs.values():
+            span.end()
+        self._runs.clear()
+
+
+_SINKS: Dict[str, Callable[[], Any]] = {
+    "console": ConsoleSink,
+    "jsonl": JsonlSink,
+    "otel": OtelSink,
+    "null": NullSink,
+}
+
+
+# ------------------------------------------------------------------- emitter
+
+# Events at or above this level are recorded; OFF disables emit() entirely
+_min_level = OFF
+_buffer: deque = deque(maxlen=EVENT_LOG_BUFFER)
+_sinks: List[Any] = []
+_drain_lock = threading.Lock()
+_stop: Optional[threading.Event] = None
+
+
+def emit(event: str, level: int = INFO, **fields: Any) -> None:
+    """Record `event` with `fields`; never blocks and never raises."""
+    if level < _min_level:
+        return
+    _buffer.append((time.time(), level, _run_id.get(), event, fields))
+
+
+def _record(entry: _Entry) -> Record:
+    ts, level, run_id, event, fields = entry
+    return {"ts": ts, "level": logging.getLevelName(level).lower(),
+            "run_id": run_id, "event": event, **fields}
+
+
+def flush() -> None:
+    """Write out everything buffered so far (also runs at exit)."""
+    with _drain_lock:
+        entries = []
+        while _buffer:
+            entries.append(_buffer.popleft())
+        if not entries:
+            return
+        records = [_record(e) for e in entries]
+        for sink in _sinks:
+            try:
+                sink.write(records)
+            except Exception:
+                # Logging must never take a run down
+                pass
+
+
+def _worker(stop: threading.Event) -> None:
+    while not stop.wait(_FLUSH_INTERVAL_S):
+        flush()
+
+
+def configure(
+    sinks: Sequence[Any] = (), level: int = INFO, buffer_size: int = EVENT_LOG_BUFFER
+) -> None:
+    """(Re)configure the emitter; no sinks disables it."""
+    global _min_level, _buffer, _sinks, _stop
+    shutdown()
+    _sinks = list(sinks)
+    _buffer = deque(maxlen=buffer_size)
+    if not _sinks:
+        _min_level = OFF
+        return
+    _stop = threading.Event()
+    threading.Thread(
+        target=_worker, args=(_stop,), name="event-log", daemon=True).start()
+    _min_level = level
+
+
+def shutdown() -> None:
+    global _min_level, _stop
+    _min_level = OFF
+    if _stop is not None:
+        _stop.set()
+        _stop = None
+    flush()
+    for sink in _sinks:
+        sink.close()
+    _sinks.clear()
+
+
+def configure_from_env() -> None:
+    names = [n.strip() for n in EVENT_LOG.split(",") if n.strip()]
+    if not names or names == ["off"]:
+        configure([])
+        return
+    unknown = [n for n in names if n not in _SINKS]
+    if unknown:
+        raise ValueError(f"Unknown EVENT_LOG sink(s): {', '.join(unknown)}")
+    level = logging.getLevelName(EVENT_LOG_LEVEL)
+    if not isinstance(level, int):
+        raise ValueError(f"Unknown EVENT_LOG_LEVEL: {EVENT_LOG_LEVEL}")
+    configure([_SINKS[n]() for n in names], level=level)
+
+
+# --------------------------------------------------------------- correlation
+
+def current_run_id() -> Optional[str]:
+    return _run_id.get()
+
+
+@contextlib.contextmanager
+def run_context(run_id: Optional[str] = None) -> Iterator[str]:
+    """Binds a run id to every event emitted inside, bracketed by run_start/run_end."""
+    run_id = run_id or uuid.uuid4().hex
+    token = _run_id.set(run_id)
+    t0 = time.perf_counter()
+    status = "error"
+    emit("run_start")
+    try:
+        yield run_id
+        status = "ok"
+    finally:
+        emit("run_end", status=status,
+             duration_ms=round((time.perf_counter() - t0) * 1000.0, 3))
+        _run_id.reset(token)
+
+
+def traced(node: Callable[[Any], Dict[str, Any]]) -> Callable[[Any], Dict[str, Any]]:
+    """Wraps a graph node with node_start / node_end (or node_error) events."""
+    name = node.__name__
+
+    @functools.wraps(node)
+    def wrapper(state: Any) -> Dict[str, Any]:
+        # Start/end are INFO; node_error is ERROR and must survive a
+        # WARNING/ERROR level filter
+        info = _min_level <= INFO
+        if info:
+            emit("node_start", node=name)
+            t0 = time.perf_counter()
+        try:
+            out = node(state)
+        except Exception as e:
+            emit("node_error", ERROR, node=name, error=repr(e))
+            raise
+        if info:
+            emit("node_end", node=name,
+                 duration_ms=round((time.perf_counter() - t0) * 1000.0, 3),
+                 updates=sorted(out) if out else [])
+        return out
+
+    return wrapper
+
+
+configure_from_env()
+atexit.register(shutdown)
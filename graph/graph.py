@@ -4,117 +4,82 @@ from pathlib import Path
 from langgraph.graph import END, StateGraph
 from langchain_core.runnables.graph_mermaid import draw_mermaid_png
 
-from graph.consts import RETRIEVE, GRADE_DOCUMENTS, GENERATE, WEBSEARCH
-from graph.nodes import generate, grade_documents, retrieve, web_search
+from graph.consts import (
+    RETRIEVE,
+    GRADE_DOCUMENTS,
+    GENERATE,
+    GRADE_GENERATION,
+    WEBSEARCH,
+)
+from graph import events
+from graph.nodes import (
+    generate,
+    grade_documents,
+    grade_generation,
+    retrieve,
+    web_search,
+)
+from graph.deadline import (
+    DEADLINE_EXCEEDED,
+    DeadlineExceeded,
+    deadline_guard,
+    invoke_with_deadline,
+    mark_partial,
+)
+from graph.retry import DONE, GIVE_UP, REGENERATE
 from graph.state import GraphState
-from graph.chains.answer_grader import answer_grader
-from graph.chains.hallucination_grader import hallucination_grader
 from graph.chains.router import question_router, RouteQuery
-from langchain_google_genai.chat_models import ChatGoogleGenerativeAIError
-import re
-import time
-from graph.llm import invoke_with_429_retry
 
 
 load_dotenv()
 
 
 def decide_to_generate(state: GraphState) -> str:
-    print("---ASSESS GRADED DOCUMENTS---")
-    if state["web_search"]:
-        print("---DECISION: INCLUDE WEB SEARCH---")
-        return WEBSEARCH
-    print("---DECISION: GENERATE---")
-    return GENERATE
-
+    if state.get("partial"):
+        return DEADLINE_EXCEEDED
+    next_step = WEBSEARCH if state["web_search"] else GENERATE
+    events.emit("edge", edge="decide_to_generate", next=next_step)
+    return next_step
 
-def grade_generation_grounded_in_documents_and_question(state: GraphState) -> str:
-    print("---CHECK GENERATION QUALITY---")
-    question = state["question"]
-    documents = state.get("documents", [])
-    generation = state["generation"]
-
-    # Convert docs to text for the grader (works whether they are Document objects or strings)
-    docs_text = "\n\n".join(
-        getattr(d, "page_content", str(d)) for d in documents
-    )
 
-    try:
-        score = invoke_with_429_retry(
-            answer_grader,
-            {"question": question, "documents": docs_text, "generation": generation},
-            max_retries=2,
-        )
-
-    except ChatGoogleGenerativeAIError as e:
-        msg = str(e)
-        if "RESOURCE_EXHAUSTED" in msg or "429" in msg:
-            m = re.search(r"Please retry in ([0-9.]+)s", msg)
-            wait_s = float(m.group(1)) + 0.5 if m else 12.5
-            print(
-                f"---SLEEPING FOR {wait_s} SECONDS DUE TO RESOURCE EXHAUSTION---")
-            time.sleep(wait_s)
-            score = invoke_with_429_retry(
-                answer_grader,
-                {"question": question, "documents": docs_text,
-                    "generation": generation},
-                max_retries=2,
-            )
-        else:
-            raise
-
-    verdict = score.verdict
-
-    if verdict == "useful":
-        print("---DECISION: USEFUL---")
-        return "useful"
-
-    if verdict == "not_useful":
-        print("---DECISION: NOT_USEFUL---")
-        return "not_useful"
-
-    # verdict == "not_supported" -> retry
-    retry_count = state.get("retry_count", 0) + 1
-    state["retry_count"] = retry_count
-
-    if retry_count >= 2:
-        print("---MAX RETRIES REACHED: STOP---")
-        return "give_up"
-
-    print(f"---DECISION: NOT_SUPPORTED (RETRY #{retry_count})---")
-
-    if retry_count >= 2:
-        print("---MAX RETRIES REACHED: FALLBACK TO WEBSEARCH---")
-        return "not_useful"
-
-    return "not_supported"
+def decide_after_grading(state: GraphState) -> str:
+    if state.get("partial"):
+        return DEADLINE_EXCEEDED
+    # grade_generation already chose the next step within the retry budget
+    events.emit("edge", edge="decide_after_grading", next=state["retry_strategy"])
+    return state["retry_strategy"]
 
 
 def route_question(state: GraphState) -> str:
-    print("---ROUTE QUESTION---")
     question = state["question"]
-    source: RouteQuery = question_router.invoke({"question": question})
+    try:
+        source: RouteQuery = invoke_with_deadline(
+            question_router, {"question": question}, state.get("deadline"))
+    except DeadlineExceeded:
+        # Ends the run through mark_partial, which sets partial=True
+        return DEADLINE_EXCEEDED
+    events.emit("edge", edge="route_question", datasource=source.datasource)
     if source.datasource == WEBSEARCH:
-        print("---ROUTE QUESTION TO WEB SEARCH---")
         return WEBSEARCH
     elif source.datasource == "vectorstore":
-        print("---ROUTE QUESTION TO RAG---")
         return RETRIEVE
 
 
-RETRY_GENERATE = "retry_generate"
-
+# Every node honours the request deadline (see graph.deadline) and is
+# bracketed by node_start / node_end events (see graph.events)
 workflow = StateGraph(GraphState)
-workflow.add_node(RETRIEVE, retrieve)
-workflow.add_node(GRADE_DOCUMENTS, grade_documents)
-workflow.add_node(GENERATE, generate)
-workflow.add_node(RETRY_GENERATE, generate)
-workflow.add_node(WEBSEARCH, web_search)
+workflow.add_node(RETRIEVE, events.traced(deadline_guard(retrieve)))
+workflow.add_node(GRADE_DOCUMENTS, events.traced(deadline_guard(grade_documents)))
+workflow.add_node(GENERATE, events.traced(deadline_guard(generate)))
+workflow.add_node(GRADE_GENERATION, events.traced(deadline_guard(grade_generation)))
+workflow.add_node(WEBSEARCH, events.traced(deadline_guard(web_search)))
+workflow.add_node(DEADLINE_EXCEEDED, events.traced(mark_partial))
 
 workflow.set_conditional_entry_point(route_question,
                                      {
                                          WEBSEARCH: WEBSEARCH,
                                          RETRIEVE: RETRIEVE,
+                                         DEADLINE_EXCEEDED: DEADLINE_EXCEEDED,
                                      },)
 
 # workflow.set_entry_point(RETRIEVE)
@@ -123,23 +88,26 @@ workflow.add_edge(RETRIEVE, GRADE_DOCUMENTS)
 workflow.add_conditional_edges(
     GRADE_DOCUMENTS,
     decide_to_generate,
-    {WEBSEARCH: WEBSEARCH, GENERATE: GENERATE},
+    {WEBSEARCH: WEBSEARCH, GENERATE: GENERATE, DEADLINE_EXCEEDED: END},
 )
 
+workflow.add_edge(GENERATE, GRADE_GENERATION)
+
+# Retry loop: bounded by max_retries and the request deadline (graph.retry)
 workflow.add_conditional_edges(
-    GENERATE,
-    grade_generation_grounded_in_documents_and_question,
+    GRADE_GENERATION,
+    decide_after_grading,
     {
-        "useful": END,
-        "not_useful": WEBSEARCH,
-        "not_supported": RETRY_GENERATE,
-        "give_up": END,
+        DONE: END,
+        REGENERATE: GENERATE,
+        WEBSEARCH: WEBSEARCH,
+        GIVE_UP: END,
+        DEADLINE_EXCEEDED: END,
     },
 )
 
 workflow.add_edge(WEBSEARCH, GENERATE)
-# <-- this creates the loop you want
-workflow.add_edge(RETRY_GENERATE, GENERATE)
+workflow.add_edge(DEADLINE_EXCEEDED, END)
 
 app = workflow.compile()
 
@@ -1,10 +1,50 @@
 import os
 import re
-import time
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import List, Literal, Optional, Type
 from dotenv import load_dotenv
+from langchain_core.exceptions import OutputParserException
+from langchain_core.runnables import Runnable, RunnableLambda
+from pydantic import BaseModel, ValidationError
+
+from graph.deadline import invoke_with_deadline, sleep_within_deadline
+from graph.metrics import RoleMetricsCallback, record_escalation
 
 load_dotenv()
 
+ModelTier = Literal["small", "large"]
+ChainRole = Literal[
+    "router", "doc_grader", "generator", "answer_grader", "hallucination_grader"
+]
+
+
+@dataclass(frozen=True)
+class RoleConfig:
+    tier: ModelTier
+    max_output_tokens: int
+    timeout_s: float
+
+
+# Defaults per chain role; override with LLM_<ROLE>_TIER / _MAX_TOKENS / _TIMEOUT_S.
+# Output budgets stay at 200: Gemini 2.5 counts thinking tokens against
+# max_output_tokens, so a tighter cap can leave a structured reply empty.
+ROLE_DEFAULTS = {
+    "router": RoleConfig("small", 200, 10.0),
+    "doc_grader": RoleConfig("small", 200, 20.0),
+    "generator": RoleConfig("large", 200, 30.0),
+    "answer_grader": RoleConfig("small", 200, 20.0),
+    "hallucination_grader": RoleConfig("small", 200, 20.0),
+}
+
+# LLM_CASCADE=on: small-tier structured chains retry once on the large model
+# when the small model's output fails schema validation.
+CASCADE_ENABLED = os.getenv("LLM_CASCADE", "on").lower() in ("1", "true", "on")
+
+# Ollama: keep models resident between requests and reuse HTTP connections
+OLLAMA_KEEP_ALIVE = os.getenv("OLLAMA_KEEP_ALIVE", "30m")
+OLLAMA_MAX_CONNECTIONS = int(os.getenv("OLLAMA_MAX_CONNECTIONS", "16"))
+
 
 def _retry_sleep_from_msg(msg: str, default: float = 12.5) -> float:
     m = re.search(r"Please retry in ([0-9.]+)s", msg)
@@ -13,51 +53,213 @@ def _retry_sleep_from_msg(msg: str, default: float = 12.5) -> float:
     return default
 
 
-def invoke_with_429_retry(chain, payload, max_retries: int = 2):
-    # Generic wrapper for chain.invoke(...)
+def invoke_with_429_retry(
+    chain, payload, max_retries: int = 2, deadline: Optional[float] = None
+):
+    # Generic wrapper for chain.invoke(...); never waits past `deadline`
     for attempt in range(max_retries + 1):
         try:
-            return chain.invoke(payload)
+            return invoke_with_deadline(chain, payload, deadline)
         except Exception as e:
             msg = str(e)
             if "RESOURCE_EXHAUSTED" not in msg and "429" not in msg:
                 raise
             if attempt >= max_retries:
                 raise
-            time.sleep(_retry_sleep_from_msg(msg))
+            sleep_within_deadline(_retry_sleep_from_msg(msg), deadline)
+
+
+def role_config(role: ChainRole) -> RoleConfig:
+    default = ROLE_DEFAULTS[role]
+    prefix = f"LLM_{role.upper()}"
+    return RoleConfig(
+        tier=os.getenv(f"{prefix}_TIER", default.tier),
+        max_output_tokens=int(
+            os.getenv(f"{prefix}_MAX_TOKENS", default.max_output_tokens)),
+        timeout_s=float(os.getenv(f"{prefix}_TIMEOUT_S", default.timeout_s)),
+    )
+
+
+def tier_model(provider: str, tier: ModelTier) -> str:
+    # <PROVIDER>_SMALL_MODEL (routing/grading) and <PROVIDER>_LARGE_MODEL
+    # (generation) both fall back to GEMINI_MODEL / OLLAMA_MODEL.
+    if provider == "gemini":
+        default = os.getenv("GEMINI_MODEL", "gemini-2.5-flash")
+    else:
+        default = os.getenv("OLLAMA_MODEL", "llama3.1:8b")
+    return os.getenv(f"{provider.upper()}_{tier.upper()}_MODEL", default)
+
+
+def ollama_model(tier: ModelTier = "large") -> str:
+    return tier_model("ollama", tier)
+
+
+@lru_cache(maxsize=None)
+def _shared_ollama_clients(host: Optional[str]):
+    """One pooled sync/async client pair per Ollama host, shared by all chains."""
+    import httpx
+    from ollama import AsyncClient, Client
+
+    limits = httpx.Limits(
+        max_connections=OLLAMA_MAX_CONNECTIONS,
+        max_keepalive_connections=OLLAMA_MAX_CONNECTIONS,
+    )
+    return (
+        Client(host=host, limits=limits),
+        AsyncClient(host=host, limits=limits),
+    )
+
+
+@lru_cache(maxsize=None)
+def _role_ollama_clients(host: Optional[str], timeout_s: float):
+    """
+    Client pair for one role timeout: both reuse the host's shared httpx pool
+    and pass `timeout_s` per request (httpx's per-request timeout) instead of
+    owning a pool configured with it.
+    """
+    from ollama import AsyncClient, Client
+
+    client, async_client = _shared_ollama_clients(host)
+
+    class _TimedClient(Client):
+        def __init__(self) -> None:
+            self._client = client._client
 
+        def _request(self, cls, *args, stream: bool = False, **kwargs):
+            kwargs.setdefault("timeout", timeout_s)
+            return super()._request(cls, *args, stream=stream, **kwargs)
 
-def get_chat_llm(temperature: float = 0.0, max_output_tokens: int | None = None):
+    class _TimedAsyncClient(AsyncClient):
+        def __init__(self) -> None:
+            self._client = async_client._client
+
+        async def _request(self, cls, *args, stream: bool = False, **kwargs):
+            kwargs.setdefault("timeout", timeout_s)
+            return await super()._request(cls, *args, stream=stream, **kwargs)
+
+    return _TimedClient(), _TimedAsyncClient()
+
+
+def warm_ollama_models() -> List[str]:
+    """
+    Load every configured Ollama model into memory (an empty generate call)
+    and pin it for OLLAMA_KEEP_ALIVE, so the first request doesn't pay the
+    model load. Returns the models warmed.
+    """
+    client, _ = _shared_ollama_clients(os.getenv("OLLAMA_BASE_URL"))
+    models = sorted({ollama_model("small"), ollama_model("large")})
+    for model in models:
+        client.generate(model=model, keep_alive=OLLAMA_KEEP_ALIVE)
+    return models
+
+
+def get_chat_llm(
+    role: ChainRole = "generator",
+    temperature: float = 0.0,
+    max_output_tokens: int | None = None,
+    tier: ModelTier | None = None,
+):
     """
     Centralized LLM factory.
     Choose provider via env:
       LLM_PROVIDER=gemini|ollama
+    `role` picks the model tier, output token limit and timeout (see
+    ROLE_DEFAULTS); `max_output_tokens` and `tier` override the role's values.
     """
 
     provider = os.getenv("LLM_PROVIDER", "gemini").lower()
+    cfg = role_config(role)
+    tier = tier or cfg.tier
+    if max_output_tokens is None:
+        max_output_tokens = cfg.max_output_tokens
 
     if provider == "gemini":
         from langchain_google_genai import ChatGoogleGenerativeAI
 
-        model = os.getenv("GEMINI_MODEL", "gemini-2.5-flash")
-        kwargs = dict(
+        model = tier_model(provider, tier)
+        return ChatGoogleGenerativeAI(
             google_api_key=os.environ["GEMINI_API_KEY"],
             model=model,
             temperature=temperature,
+            max_output_tokens=max_output_tokens,
+            timeout=cfg.timeout_s,
+            callbacks=[RoleMetricsCallback(role, model)],
         )
-        if max_output_tokens is not None:
-            kwargs["max_output_tokens"] = max_output_tokens
-        return ChatGoogleGenerativeAI(**kwargs)
 
     if provider == "ollama":
         # Requires: pip install langchain-ollama
         from langchain_ollama import ChatOllama
 
-        model = os.getenv("OLLAMA_MODEL", "llama3.1:8b")
-        kwargs = dict(model=model, temperature=temperature)
-        # ChatOllama uses num_predict rather than max_output_tokens
-        if max_output_tokens is not None:
-            kwargs["num_predict"] = max_output_tokens
-        return ChatOllama(**kwargs)
+        host = os.getenv("OLLAMA_BASE_URL")
+        model = tier_model(provider, tier)
+        llm = ChatOllama(
+            model=model,
+            temperature=temperature,
+            # ChatOllama uses num_predict rather than max_output_tokens
+            num_predict=max_output_tokens,
+            keep_alive=OLLAMA_KEEP_ALIVE,
+            base_url=host,
+            callbacks=[RoleMetricsCallback(role, model)],
+        )
+        # Share one connection pool across all chains instead of one per
+        # chain; the role's timeout is applied per request
+        llm._client, llm._async_client = _role_ollama_clients(
+            host, cfg.timeout_s)
+        return llm
 
     raise ValueError(f"Unknown LLM_PROVIDER: {provider}")
+
+
+def _require_parsed(result):
+    # with_structured_output returns None when the model emits no parsable output
+    if result is None:
+        raise OutputParserException("Structured output missing or invalid")
+    return result
+
+
+def get_structured_llm(
+    role: ChainRole,
+    schema: Type[BaseModel],
+    temperature: float = 0.0,
+    max_output_tokens: int | None = None,
+) -> Runnable:
+    """
+    get_chat_llm(role).with_structured_output(schema), with a small/large
+    cascade: if the role runs on the small tier and its output fails
+    validation, the same input is retried once on the large model.
+    """
+    llm = get_chat_llm(role, temperature, max_output_tokens)
+    structured = llm.with_structured_output(schema) | RunnableLambda(_require_parsed)
+
+    provider = os.getenv("LLM_PROVIDER", "gemini").lower()
+    if (
+        not CASCADE_ENABLED
+        or role_config(role).tier != "small"
+        or tier_model(provider, "small") == tier_model(provider, "large")
+    ):
+        return structured
+
+    def escalate(payload):
+        record_escalation(role)
+        return payload
+
+    large = get_chat_llm(role, temperature, max_output_tokens, tier="large")
+    return structured.with_fallbacks(
+        [
+            RunnableLambda(escalate)
+            | large.with_structured_output(schema)
+            | RunnableLambda(_require_parsed)
+        ],
+        exceptions_to_handle=(OutputParserException, ValidationError),
+    )
+
+
+def get_embeddings():
+    """Embedding model shared by ingestion, retrieval and the benchmarks."""
+    from langchain_google_genai import GoogleGenerativeAIEmbeddings
+
+    return GoogleGenerativeAIEmbeddings(
+        google_api_key=os.environ["GEMINI_API_KEY"],
+        model=os.environ.get("EMBEDDING_MODEL", "text-embedding-004"),
+        chunk_size=50,
+        retry_min_seconds=10)
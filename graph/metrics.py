@@ -0,0 +1,115 @@
+import json
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Dict
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+
+# USD per 1M (input, output) tokens. Local Ollama models cost nothing.
+# Override or extend with LLM_PRICES='{"model": [input, output], ...}'.
+MODEL_PRICES: Dict[str, tuple] = {
+    "gemini-2.5-flash": (0.30, 2.50),
+    "gemini-2.5-flash-lite": (0.10, 0.40),
+    "gemini-2.5-pro": (1.25, 10.00),
+}
+MODEL_PRICES.update(
+    {k: tuple(v) for k, v in json.loads(os.getenv("LLM_PRICES", "{}")).items()})
+
+
+@dataclass
+class RoleStats:
+    calls: int = 0
+    errors: int = 0
+    escalations: int = 0
+    latency_s: float = 0.0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cost_usd: float = 0.0
+
+
+_lock = threading.Lock()
+_stats: Dict[str, RoleStats] = {}
+_cache_stats: Dict[str, Dict[str, int]] = {}
+
+
+def _role(role: str) -> RoleStats:
+    return _stats.setdefault(role, RoleStats())
+
+
+def record_escalation(role: str) -> None:
+    with _lock:
+        _role(role).escalations += 1
+
+
+def record_cache(cache: str, hit: bool) -> None:
+    with _lock:
+        stats = _cache_stats.setdefault(cache, {"hits": 0, "misses": 0})
+        stats["hits" if hit else "misses"] += 1
+
+
+def cache_snapshot() -> Dict[str, Dict[str, Any]]:
+    """Hits, misses and hit rate per cache."""
+    with _lock:
+        out = {}
+        for cache, s in _cache_stats.items():
+            total = s["hits"] + s["misses"]
+            out[cache] = {**s, "hit_rate": round(s["hits"] / total, 3) if total else 0.0}
+        return out
+
+
+def snapshot() -> Dict[str, Dict[str, Any]]:
+    """Per-role totals plus mean latency, for logging or benchmarks."""
+    with _lock:
+        out = {}
+        for role, s in _stats.items():
+            row = asdict(s)
+            row["mean_latency_ms"] = (
+                round(s.latency_s * 1000.0 / s.calls, 1) if s.calls else 0.0)
+            row["cost_usd"] = round(s.cost_usd, 6)
+            out[role] = row
+        return out
+
+
+def reset() -> None:
+    with _lock:
+        _stats.clear()
+        _cache_stats.clear()
+
+
+class RoleMetricsCallback(BaseCallbackHandler):
+    """Attached to a chat model; records latency, tokens and cost under `role`."""
+
+    def __init__(self, role: str, model: str) -> None:
+        self.role = role
+        self.model = model
+        self._started: Dict[UUID, float] = {}
+
+    def on_chat_model_start(self, serialized, messages, *, run_id: UUID, **kwargs: Any) -> None:
+        self._started[run_id] = time.perf_counter()
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        elapsed = time.perf_counter() - self._started.pop(run_id, time.perf_counter())
+        input_tokens = output_tokens = 0
+        for generations in response.generations:
+            for g in generations:
+                usage = getattr(getattr(g, "message", None), "usage_metadata", None)
+                if usage:
+                    input_tokens += usage.get("input_tokens", 0)
+                    output_tokens += usage.get("output_tokens", 0)
+        price_in, price_out = MODEL_PRICES.get(self.model, (0.0, 0.0))
+        with _lock:
+            s = _role(self.role)
+            s.calls += 1
+            s.latency_s += elapsed
+            s.input_tokens += input_tokens
+            s.output_tokens += output_tokens
+            s.cost_usd += (input_tokens * price_in + output_tokens * price_out) / 1e6
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._started.pop(run_id, None)
+        with _lock:
+            _role(self.role).errors += 1
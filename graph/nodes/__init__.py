@@ -1,6 +1,8 @@
 from graph.nodes.generate import generate
 from graph.nodes.grade_documents import grade_documents
+from graph.nodes.grade_generation import grade_generation
 from graph.nodes.retrieve import retrieve
 from graph.nodes.web_search import web_search
 
-__all__ = ["generate", "grade_documents", "retrieve", "web_search"]
+__all__ = ["generate", "grade_documents", "grade_generation",
+           "retrieve", "web_search"]
@@ -1,49 +1,44 @@
-from typing import Any, Dict, List
-from langchain_core.documents import Document
-
-from graph.chains.generation import generation_chain
+from typing import Any, Dict
+
+from graph import events
+from graph.chains.generation import generation_chain, generation_retry_chain
+from graph.chains.self_graded_generation import (
+    SELF_GRADE_ENABLED,
+    self_graded_generation_chain,
+    self_graded_generation_retry_chain,
+    to_self_grade,
+)
+from graph.context import generation_inputs
+from graph.deadline import invoke_with_deadline
 from graph.state import GraphState
 
-MAX_DOCS = 4
-MAX_CHARS_PER_DOC = 1500  # keep prompts small
-
-
-def _docs_to_context(docs: List[Document]) -> str:
-    cleaned: List[str] = []
-    for d in docs[:MAX_DOCS]:
-        if not isinstance(d, Document):
-            continue  # ignore poisoned entries
-        src = d.metadata.get("source") or d.metadata.get("url") or ""
-        text = (d.page_content or "").strip()
-        if not text:
-            continue
-        text = text[:MAX_CHARS_PER_DOC]
-        cleaned.append(f"SOURCE: {src}\n{text}")
-    return "\n\n".join(cleaned)
-
 
 def generate(state: GraphState) -> Dict[str, Any]:
-    print("---GENERATE---")
-
-    question = state["question"]
-    documents = state.get("documents", [])
-
-    context = _docs_to_context(documents)
-
+    deadline = state.get("deadline")
     retry_count = state.get("retry_count", 0)
-    print("First generation attempt" if retry_count ==
-          0 else f"Retry attempt #{retry_count}")
 
-    generation = generation_chain.invoke(
-        {
-            "context": context,     # IMPORTANT: string, not list[Document]
-            "question": question,
-            "retry": retry_count > 0,
+    # Regenerate retries get a widened context and the grader's feedback
+    inputs = generation_inputs(state)
+    events.emit("generate", attempt=retry_count + 1,
+                strategy=state.get("retry_strategy") or "initial",
+                self_grade=SELF_GRADE_ENABLED, context_chars=len(inputs["context"]))
+
+    if SELF_GRADE_ENABLED:
+        # One call: answer + self-assessment (answer_grader only on audits)
+        chain = (self_graded_generation_retry_chain if "feedback" in inputs
+                 else self_graded_generation_chain)
+        result = invoke_with_deadline(chain, inputs, deadline)
+        return {
+            "generation": result.answer,
+            "self_grade": to_self_grade(result),
         }
-    )
+
+    chain = generation_retry_chain if "feedback" in inputs else generation_chain
+    generation = invoke_with_deadline(chain, inputs, deadline)
 
     return {
         "generation": generation,
+        "self_grade": None,
         # do NOT re-return question/documents unless you truly need to update them
         # returning them increases chance of concurrent-update and poisoning
     }
@@ -1,6 +1,8 @@
 from typing import Any, Dict
 
+from graph import events
 from graph.chains.retrieval_grader import retrieval_grader
+from graph.deadline import invoke_with_deadline
 from graph.state import GraphState
 
 MAX_DOCS_TO_KEEP = 4
@@ -22,30 +24,35 @@ def grade_documents(state: GraphState) -> Dict[str, Any]:
     Grades ALL retrieved documents in one LLM call.
     Filters out irrelevant documents and sets web_search if none remain.
     """
-    print("---CHECK DOCUMENT RELEVANCE TO QUESTION (BATCH)---")
     question = state["question"]
     documents = state["documents"]
 
     if not documents:
-        return {"documents": [], "web_search": True}
+        return {"documents": [], "dropped_documents": [], "web_search": True}
 
     docs_blob = _format_docs_for_grading(documents)
 
-    result = retrieval_grader.invoke(
-        {"question": question, "documents": docs_blob})
+    result = invoke_with_deadline(
+        retrieval_grader,
+        {"question": question, "documents": docs_blob},
+        state.get("deadline"),
+    )
 
     # Map: index -> relevant
     relevant_map = {g.index: bool(g.relevant) for g in result.grades}
 
-    filtered_docs = []
+    filtered_docs, dropped_docs = [], []
     for i, d in enumerate(documents):
-        if relevant_map.get(i, False):
-            print(f"---DOC {i}: RELEVANT---")
-            filtered_docs.append(d)
-        else:
-            print(f"---DOC {i}: NOT RELEVANT---")
+        relevant = relevant_map.get(i, False)
+        events.emit("doc_graded", events.DEBUG, index=i, relevant=relevant)
+        (filtered_docs if relevant else dropped_docs).append(d)
 
+    # Kept for a "regenerate" retry, which widens the context with them
+    dropped_docs = filtered_docs[MAX_DOCS_TO_KEEP:] + dropped_docs
     filtered_docs = filtered_docs[:MAX_DOCS_TO_KEEP]
 
     web_search = len(filtered_docs) == 0
-    return {"documents": filtered_docs, "web_search": web_search}
+    events.emit("documents_graded", total=len(documents),
+                relevant=len(filtered_docs), web_search=web_search)
+    return {"documents": filtered_docs, "dropped_documents": dropped_docs,
+            "web_search": web_search}
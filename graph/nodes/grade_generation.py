@@ -0,0 +1,100 @@
+import re
+from typing import Any, Dict, Optional
+
+from langchain_google_genai.chat_models import ChatGoogleGenerativeAIError
+
+from graph import events
+from graph.chains.answer_grader import GradeAnswer, answer_grader
+from graph.chains.self_graded_generation import should_audit
+from graph.deadline import sleep_within_deadline, time_left
+from graph.llm import invoke_with_429_retry
+from graph.retry import DONE, choose_retry_strategy
+from graph.state import GraphState
+
+
+def _invoke_answer_grader(
+    question: str, docs_text: str, generation: str, deadline: Optional[float]
+) -> GradeAnswer:
+    try:
+        score = invoke_with_429_retry(
+            answer_grader,
+            {"question": question, "documents": docs_text, "generation": generation},
+            max_retries=2,
+            deadline=deadline,
+        )
+
+    except ChatGoogleGenerativeAIError as e:
+        msg = str(e)
+        if "RESOURCE_EXHAUSTED" in msg or "429" in msg:
+            m = re.search(r"Please retry in ([0-9.]+)s", msg)
+            wait_s = float(m.group(1)) + 0.5 if m else 12.5
+            events.emit("rate_limited", events.WARNING, wait_s=wait_s)
+            sleep_within_deadline(wait_s, deadline)
+            score = invoke_with_429_retry(
+                answer_grader,
+                {"question": question, "documents": docs_text,
+                    "generation": generation},
+                max_retries=2,
+                deadline=deadline,
+            )
+        else:
+            raise
+
+    return score
+
+
+def grade_generation(state: GraphState) -> Dict[str, Any]:
+    """
+    Grades the latest generation and, if it is not useful, picks the retry
+    strategy within the retry budget (max_retries) and deadline.
+    Every attempt is appended to the `attempts` run trace.
+    """
+    question = state["question"]
+    documents = state.get("documents", [])
+    generation = state["generation"]
+
+    self_grade = state.get("self_grade")
+    if self_grade and not should_audit(self_grade):
+        verdict = self_grade["verdict"]
+        feedback = None
+        graded_by = "self_grade"
+    else:
+        if self_grade:
+            events.emit("self_grade_audit", events.DEBUG,
+                        self_verdict=self_grade["verdict"])
+        # Convert docs to text for the grader (works whether they are Document objects or strings)
+        docs_text = "\n\n".join(
+            getattr(d, "page_content", str(d)) for d in documents
+        )
+        score = _invoke_answer_grader(
+            question, docs_text, generation, state.get("deadline"))
+        verdict, feedback = score.verdict, score.reason
+        graded_by = "answer_grader"
+
+    retry_count = state.get("retry_count", 0)
+    if verdict == "useful":
+        next_step = DONE
+    else:
+        retry_count += 1
+        next_step = choose_retry_strategy(state, verdict, retry_count)
+
+    events.emit("generation_graded", verdict=verdict, graded_by=graded_by,
+                next=next_step, retry_count=retry_count)
+
+    remaining = time_left(state.get("deadline"))
+    attempt = {
+        "attempt": len(state.get("attempts") or []) + 1,
+        "strategy": state.get("retry_strategy") or "initial",
+        "verdict": verdict,
+        "graded_by": graded_by,
+        "next": next_step,
+        "remaining_s": None if remaining is None else round(remaining, 3),
+    }
+
+    return {
+        "generation_verdict": verdict,
+        "generation_feedback": feedback,
+        "retry_count": retry_count,
+        "retry_strategy": next_step,
+        "attempts": [attempt],
+    }
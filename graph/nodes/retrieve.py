@@ -1,12 +1,34 @@
 from typing import Any, Dict
 
+from langchain_core.documents import Document
+
+from docstore import expand_to_parent_spans
+from graph import events
+from graph.deadline import invoke_with_deadline
 from graph.state import GraphState
-from ingestion import retriever
+from ingestion import docstore, rerank_top_n, reranker, retriever
+from rerank import rerank
+
+
+def _expand_window(doc: Document) -> Document:
+    # sentence_window chunks match on one sentence but are graded/generated
+    # from the sentences around it
+    window = doc.metadata.get("window")
+    if not window:
+        return doc
+    return Document(page_content=window, metadata=doc.metadata, id=doc.id)
 
 
 def retrieve(state: GraphState) -> Dict[str, Any]:
-    print("---RETRIEVE---")
     question = state["question"]
 
-    documents = retriever.invoke(question)
-    return {"documents": documents}
+    documents = invoke_with_deadline(
+        retriever, question, state.get("deadline"))
+    candidates = len(documents)
+    if reranker is not None:
+        documents = rerank(reranker, question, documents, rerank_top_n)
+    if docstore is not None:
+        # small-to-big: fewer, deduplicated parent spans instead of raw chunks
+        documents = expand_to_parent_spans(documents, docstore)
+    events.emit("retrieved", candidates=candidates, documents=len(documents))
+    return {"documents": [_expand_window(d) for d in documents]}
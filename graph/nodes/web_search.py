@@ -3,34 +3,34 @@ from typing import Any, Dict
 from langchain_core.documents import Document
 from langchain_tavily import TavilySearch
 
+from graph import events
+from graph.deadline import invoke_with_deadline
 from graph.state import GraphState
 from dotenv import load_dotenv
 import os
 
-print("CWD:", os.getcwd())
 load_dotenv()
-print("TAVILY_API_KEY:", "SET" if os.getenv("TAVILY_API_KEY") else "MISSING")
+if not os.getenv("TAVILY_API_KEY"):
+    events.emit("config_missing", events.WARNING, name="TAVILY_API_KEY")
 
 web_search_tool = TavilySearch(max_results=3)
 
 
 def web_search(state: GraphState) -> Dict[str, Any]:
-    print("---WEB SEARCH---")
     question = state['question']
-    documents = state.get("documents", [])
+    documents = state.get("documents") or []
 
-    tavily_results = web_search_tool.invoke({"query": question})
+    tavily_results = invoke_with_deadline(
+        web_search_tool, {"query": question}, state.get("deadline"))
     joined_tavily_result = "\n\n".join(
         [tavily_result["content"]
             for tavily_result in tavily_results["results"]]
     )
     web_results = Document(page_content=joined_tavily_result)
-    if documents is not None:
-        documents.append(web_search)
-    else:
-        documents = [web_results]
+    events.emit("web_results", results=len(tavily_results["results"]))
 
-    return {'documents': documents}
+    # Web results first so generate's MAX_DOCS cut never drops them
+    return {'documents': [web_results] + documents, 'web_searched': True}
 
 
 if __name__ == "__main__":
@@ -0,0 +1,97 @@
+"""
+Local, versioned prompt registry.
+
+Every chain prompt lives in graph/prompts/<name>/<version>.toml with a
+`system` and a `human` template (and an optional `description`). The newest
+version is used unless PROMPT_<NAME>_VERSION pins another one. Templates are
+compiled to a ChatPromptTemplate once per process and cached.
+
+Token report:
+  python -m graph.prompt_registry
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import tomllib
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List
+
+from langchain_core.prompts import ChatPromptTemplate
+
+PROMPTS_DIR = Path(__file__).with_name("prompts")
+
+
+def _version_key(path: Path) -> int:
+    return int(path.stem.lstrip("v"))
+
+
+def list_versions(name: str) -> List[str]:
+    files = sorted((PROMPTS_DIR / name).glob("v*.toml"), key=_version_key)
+    if not files:
+        raise KeyError(f"Unknown prompt: {name}")
+    return [f.stem for f in files]
+
+
+def active_version(name: str) -> str:
+    return os.getenv(f"PROMPT_{name.upper()}_VERSION") or list_versions(name)[-1]
+
+
+@lru_cache(maxsize=None)
+def load_prompt_spec(name: str, version: str) -> Dict[str, str]:
+    path = PROMPTS_DIR / name / f"{version}.toml"
+    if not path.exists():
+        raise KeyError(f"Unknown prompt version: {name}/{version}")
+    with path.open("rb") as f:
+        return tomllib.load(f)
+
+
+@lru_cache(maxsize=None)
+def _compile(name: str, version: str) -> ChatPromptTemplate:
+    spec = load_prompt_spec(name, version)
+    return ChatPromptTemplate.from_messages(
+        [("system", spec["system"]), ("human", spec["human"])]
+    )
+
+
+def get_prompt(name: str, version: str | None = None) -> ChatPromptTemplate:
+    """Compiled single-template prompt for a chain (active version by default)."""
+    return _compile(name, version or active_version(name))
+
+
+def _token_counter():
+    try:
+        import tiktoken
+
+        enc = tiktoken.get_encoding("cl100k_base")
+        return lambda text: len(enc.encode(text))
+    except Exception:
+        # tiktoken missing or its encoding not downloadable (offline):
+        # rough fallback of ~4 characters per token
+        return lambda text: (len(text) + 3) // 4
+
+
+def token_report() -> List[Dict[str, object]]:
+    """Static token count (placeholders excluded) for every prompt version."""
+    count = _token_counter()
+    rows = []
+    for prompt_dir in sorted(p for p in PROMPTS_DIR.iterdir() if p.is_dir()):
+        name = prompt_dir.name
+        for version in list_versions(name):
+            spec = load_prompt_spec(name, version)
+            text = re.sub(r"\{[a-z_]+\}", "", spec["system"] + spec["human"])
+            rows.append({
+                "prompt": name,
+                "version": version,
+                "active": version == active_version(name),
+                "tokens": count(text),
+            })
+    return rows
+
+
+if __name__ == "__main__":
+    for row in token_report():
+        marker = "*" if row["active"] else " "
+        print(f"{marker} {row['prompt']:<24} {row['version']:<4} {row['tokens']:>5} tokens")
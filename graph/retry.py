@@ -0,0 +1,49 @@
+import os
+
+from graph.consts import WEBSEARCH
+from graph.deadline import time_left
+from graph.state import GraphState
+
+# Retry strategies picked after a failed generation (or WEBSEARCH: add web
+# results, then generate again)
+REGENERATE = "regenerate"   # generate again: filtered-out docs back in, grader feedback
+GIVE_UP = "give_up"
+DONE = "done"               # generation was useful, nothing to retry
+
+# Rough wall-clock cost of each strategy; a strategy is only chosen if the
+# remaining request budget can still pay for it.
+REGENERATE_COST_S = float(os.getenv("RETRY_REGENERATE_COST_S", "4"))
+WEBSEARCH_COST_S = float(os.getenv("RETRY_WEBSEARCH_COST_S", "8"))
+
+
+def choose_retry_strategy(state: GraphState, verdict: str, retry_count: int) -> str:
+    """
+    Decide what to do after a generation graded `verdict` != "useful".
+
+    retry_count is the number of failed attempts so far (including this one);
+    the graph gives up once it exceeds max_retries.
+    """
+    if retry_count > state.get("max_retries", 0):
+        return GIVE_UP
+
+    remaining = time_left(state.get("deadline"))
+
+    def affordable(cost_s: float) -> bool:
+        return remaining is None or remaining >= cost_s
+
+    # A second search for the same question returns the same results
+    can_search = not state.get("web_searched") and affordable(WEBSEARCH_COST_S)
+
+    if verdict == "not_useful":
+        # Grounded but not answering: the docs lack the answer, only new docs
+        # help; once searched, regenerate from the grader's feedback instead
+        if can_search:
+            return WEBSEARCH
+        return REGENERATE if affordable(REGENERATE_COST_S) else GIVE_UP
+
+    # not_supported: first try the cheap fix, escalate once it has failed
+    if state.get("retry_strategy") == REGENERATE and can_search:
+        return WEBSEARCH
+    if affordable(REGENERATE_COST_S):
+        return REGENERATE
+    return GIVE_UP
@@ -1,4 +1,4 @@
-from typing import List, TypedDict, Annotated
+from typing import Any, Dict, List, Optional, TypedDict, Annotated
 from langchain_core.documents import Document
 import operator
 
@@ -11,11 +11,34 @@ class GraphState(TypedDict):
         question: question
         generation: LLM generation
         web_search: whether to add search
+        web_searched: whether the web search node has already run
         documents: list of documents
+        dropped_documents: retrieved documents grade_documents filtered out;
+            a "regenerate" retry puts them back into the context
+        max_retries: retry budget (config, set by the caller)
+        retry_count: failed generation attempts so far (counter)
+        deadline: request deadline as a time.time() timestamp, or None
+        retry_strategy: next step chosen after grading the last generation
+        generation_verdict: grade of the last generation
+        generation_feedback: the answer grader's reason for that verdict
+        attempts: run trace, one record per graded generation
+        self_grade: generator's own grounding assessment (SELF_GRADE_MODE only)
+        partial: True if the deadline cut the run short; generation (if any)
+            is then the best available, possibly ungraded, answer
     """
 
     question: str
     generation: str
     web_search: bool
-    documents: Annotated[List[Document], operator.add]
+    web_searched: bool
+    documents: List[Document]
+    dropped_documents: List[Document]
+    max_retries: int
     retry_count: int
+    deadline: Optional[float]
+    retry_strategy: Optional[str]
+    generation_verdict: Optional[str]
+    generation_feedback: Optional[str]
+    attempts: Annotated[List[Dict[str, Any]], operator.add]
+    self_grade: Optional[Dict[str, Any]]
+    partial: bool
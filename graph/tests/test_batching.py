@@ -0,0 +1,66 @@
+import threading
+
+import pytest
+
+from graph.batching import MicroBatcher
+
+
+class FakeRunnable:
+    """Records each batch() call; negative inputs fail on their own."""
+
+    def __init__(self, gate: threading.Event = None) -> None:
+        self.batches = []
+        self.gate = gate
+
+    def batch(self, inputs, return_exceptions=False):
+        self.batches.append(list(inputs))
+        if self.gate is not None:
+            self.gate.wait(5)
+        return [ValueError(x) if x < 0 else x * 2 for x in inputs]
+
+
+def test_concurrent_invokes_coalesce_into_one_batch() -> None:
+    runnable = FakeRunnable()
+    batcher = MicroBatcher(runnable, max_batch_size=8, max_wait_ms=500)
+    results = {}
+
+    def call(x: int) -> None:
+        results[x] = batcher.invoke(x)
+
+    threads = [threading.Thread(target=call, args=(x,)) for x in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(5)
+
+    assert results == {0: 0, 1: 2, 2: 4, 3: 6}
+    assert len(runnable.batches) == 1
+    assert sorted(runnable.batches[0]) == [0, 1, 2, 3]
+
+
+def test_cancelled_call_is_dropped_before_the_batch_runs() -> None:
+    gate = threading.Event()
+    runnable = FakeRunnable(gate)
+    batcher = MicroBatcher(runnable, max_batch_size=1, max_wait_ms=0)
+
+    first = batcher.submit(1)
+    cancelled = batcher.submit(2)
+    last = batcher.submit(3)
+    assert cancelled.cancel()  # still queued: the worker is busy with `first`
+    gate.set()
+
+    assert (first.result(5), last.result(5)) == (2, 6)
+    assert runnable.batches == [[1], [3]]
+
+
+def test_item_exception_reaches_only_its_caller() -> None:
+    runnable = FakeRunnable()
+    batcher = MicroBatcher(runnable, max_batch_size=8, max_wait_ms=500)
+
+    futures = [batcher.submit(x) for x in (1, -1, 2)]
+
+    assert futures[0].result(5) == 2
+    with pytest.raises(ValueError):
+        futures[1].result(5)
+    assert futures[2].result(5) == 4
+    assert runnable.batches == [[1, -1, 2]]
@@ -0,0 +1,52 @@
+import pytest
+from langchain_classic.text_splitter import RecursiveCharacterTextSplitter
+from langchain_core.documents import Document
+
+import chunking
+from chunking import ChunkConfig, chunk_documents
+
+TEXT = " ".join(
+    f"Sentence {i} talks about agent memory and planning." for i in range(60))
+
+
+@pytest.fixture(autouse=True)
+def char_splitter(monkeypatch):
+    # Character-sized splits: the tiktoken encoding is not available offline
+    monkeypatch.setattr(
+        chunking, "_token_splitter",
+        lambda size, overlap: RecursiveCharacterTextSplitter(
+            chunk_size=size, chunk_overlap=overlap))
+
+
+@pytest.mark.parametrize("overlap", [0, 40])
+def test_child_offsets_match_parent_text(overlap) -> None:
+    cfg = ChunkConfig(strategy="parent_document", chunk_size=200,
+                      chunk_overlap=overlap, parent_chunk_size=900)
+    children, parents = chunk_documents(
+        [Document(page_content=TEXT, metadata={"source": "s"})], cfg)
+
+    by_id = {p.metadata["parent_id"]: p.page_content for p in parents}
+    assert len(parents) > 1 and len(children) > len(parents)
+    for child in children:
+        parent = by_id[child.metadata["parent_id"]]
+        start, end = child.metadata["start"], child.metadata["end"]
+        assert parent[start:end] == child.page_content
+
+
+def test_sentence_window_contents() -> None:
+    doc = Document(page_content="One. Two! Three? Four. Five.", metadata={})
+    chunks, _ = chunk_documents([doc], ChunkConfig(strategy="sentence_window", window=1))
+
+    assert [c.page_content for c in chunks] == ["One.", "Two!", "Three?", "Four.", "Five."]
+    assert chunks[0].metadata["window"] == "One. Two!"
+    assert chunks[2].metadata["window"] == "Two! Three? Four."
+
+
+def test_html_heading_drops_heading_only_sections() -> None:
+    html = ("<html><body><h1>T</h1><p>Intro text.</p><h2>Sub</h2>"
+            "<p>Body text.</p></body></html>")
+    doc = Document(page_content="", metadata={"source": "s", "html": html})
+    chunks, _ = chunk_documents([doc], ChunkConfig(strategy="html_heading"))
+
+    assert [c.page_content for c in chunks] == ["Intro text.", "Body text."]
+    assert chunks[1].metadata["h2"] == "Sub" and "html" not in chunks[1].metadata
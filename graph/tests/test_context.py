@@ -0,0 +1,39 @@
+from langchain_core.documents import Document
+
+from graph.context import docs_to_context, generation_inputs
+from graph.prompt_registry import get_prompt
+from graph.retry import REGENERATE
+
+
+def _docs(prefix: str, n: int):
+    return [Document(page_content=f"{prefix} {i} " + "x" * 1000) for i in range(n)]
+
+
+def test_regenerate_widens_context_and_adds_feedback() -> None:
+    state = {"question": "What is agent memory?", "documents": _docs("kept", 4),
+             "dropped_documents": _docs("dropped", 2), "generation": "First answer."}
+    first = generation_inputs(state)
+    assert first == {"question": state["question"],
+                     "context": docs_to_context(state["documents"])}
+
+    retry = generation_inputs({**state, "retry_strategy": REGENERATE,
+                               "generation_feedback": "Claims X without support."})
+    assert "dropped 0" in retry["context"] and "dropped 0" not in first["context"]
+    assert retry["previous_answer"] == "First answer."
+    assert retry["feedback"] == "Claims X without support."
+
+
+def test_regenerate_differs_even_without_dropped_documents() -> None:
+    state = {"question": "q", "documents": _docs("kept", 4), "generation": "a"}
+    retry = generation_inputs({**state, "retry_strategy": REGENERATE})
+    assert retry != generation_inputs(state)
+    assert retry["feedback"]
+
+
+def test_inputs_match_prompt_variables() -> None:
+    state = {"question": "q", "documents": _docs("kept", 1), "generation": "a"}
+    first = generation_inputs(state)
+    retry = generation_inputs({**state, "retry_strategy": REGENERATE})
+    for name in ("generation", "self_graded_generation"):
+        assert set(get_prompt(name).input_variables) == set(first)
+        assert set(get_prompt(f"{name}_retry").input_variables) == set(retry)
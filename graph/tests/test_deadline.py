@@ -0,0 +1,57 @@
+import asyncio
+import time
+
+import pytest
+from langchain_core.runnables import RunnableLambda
+
+from langgraph.graph import END, StateGraph
+
+from graph.deadline import (
+    DEADLINE_EXCEEDED,
+    DeadlineExceeded,
+    deadline_guard,
+    invoke_with_deadline,
+    mark_partial,
+)
+from graph.state import GraphState
+
+
+async def _slow(x):
+    await asyncio.sleep(5)
+    return x
+
+
+def test_invoke_without_deadline_is_plain_invoke() -> None:
+    assert invoke_with_deadline(RunnableLambda(lambda x: x + 1), 1, None) == 2
+
+
+def test_invoke_is_cancelled_at_deadline() -> None:
+    slow = RunnableLambda(lambda x: x, afunc=_slow)
+    t0 = time.perf_counter()
+    with pytest.raises(DeadlineExceeded):
+        invoke_with_deadline(slow, 1, time.time() + 0.1)
+    assert time.perf_counter() - t0 < 1.0
+
+
+def test_guard_marks_run_partial() -> None:
+    def generate(state):
+        raise DeadlineExceeded("late")
+
+    assert deadline_guard(generate)({"deadline": None}) == {"partial": True}
+    assert deadline_guard(generate)({"partial": True}) == {}
+
+
+def test_deadline_in_routing_edge_marks_run_partial() -> None:
+    # Edges can't update state: routing ends the run through mark_partial
+    workflow = StateGraph(GraphState)
+    workflow.add_node(DEADLINE_EXCEEDED, mark_partial)
+    workflow.add_node("retrieve", lambda state: {})
+    workflow.set_conditional_entry_point(
+        lambda state: DEADLINE_EXCEEDED,
+        {DEADLINE_EXCEEDED: DEADLINE_EXCEEDED, "retrieve": "retrieve"})
+    workflow.add_edge(DEADLINE_EXCEEDED, END)
+    workflow.add_edge("retrieve", END)
+
+    result = workflow.compile().invoke({"question": "q", "partial": False})
+    assert result["partial"] is True
+    assert not result.get("generation")
@@ -0,0 +1,61 @@
+import random
+
+from langchain_core.documents import Document
+
+from docstore import MmapDocStore, expand_to_parent_spans, write_docstore
+
+
+def _parent(parent_id: str, text: str) -> Document:
+    return Document(page_content=text, metadata={"parent_id": parent_id, "source": "s"})
+
+
+def _child(parent_id: str, text: str, start: int, end: int) -> Document:
+    return Document(page_content=text[start:end],
+                    metadata={"parent_id": parent_id, "start": start, "end": end})
+
+
+def test_round_trip(tmp_path) -> None:
+    write_docstore(tmp_path, [_parent("a", "Agent memory ü"), _parent("b", "Planning")])
+    store = MmapDocStore(tmp_path)
+    try:
+        assert len(store) == 2 and "a" in store and "c" not in store
+        assert store.get_text("a") == "Agent memory ü"
+        assert store.get("b").metadata == {"source": "s", "parent_id": "b"}
+        assert store.get("c") is None
+    finally:
+        store.close()
+
+
+def test_empty_store(tmp_path) -> None:
+    write_docstore(tmp_path, [])
+    store = MmapDocStore(tmp_path)
+    assert len(store) == 0 and store.get("a") is None
+    store.close()
+
+
+def test_adjacent_children_keep_the_best_child(tmp_path) -> None:
+    text = "".join(chr(65 + i % 26) * 10 for i in range(500))  # 5000 chars
+    write_docstore(tmp_path, [_parent("p", text)])
+    store = MmapDocStore(tmp_path)
+    best, second = _child("p", text, 2000, 3000), _child("p", text, 1000, 2000)
+
+    spans = expand_to_parent_spans([best, second], store)
+    assert best.page_content in spans[0].page_content
+    assert all(len(s.page_content) <= 1500 for s in spans)
+    store.close()
+
+
+def test_best_child_text_is_always_returned(tmp_path) -> None:
+    rng = random.Random(0)
+    texts = {f"p{i}": "".join(rng.choice("abcdefgh ") for _ in range(6000)) for i in range(3)}
+    write_docstore(tmp_path, [_parent(pid, t) for pid, t in texts.items()])
+    store = MmapDocStore(tmp_path)
+    for _ in range(200):
+        children = []
+        for _ in range(rng.randint(1, 8)):
+            pid = rng.choice(list(texts))
+            start = rng.randrange(0, 5000)
+            children.append(_child(pid, texts[pid], start, start + rng.randint(50, 1000)))
+        spans = expand_to_parent_spans(children, store)
+        assert children[0].page_content in spans[0].page_content
+    store.close()
@@ -0,0 +1,71 @@
+import pytest
+
+from graph import events
+
+
+class ListSink:
+    def __init__(self) -> None:
+        self.records = []
+
+    def write(self, records) -> None:
+        self.records.extend(records)
+
+    def close(self) -> None:
+        pass
+
+
+@pytest.fixture
+def sink():
+    sink = ListSink()
+    events.configure([sink], level=events.INFO)
+    yield sink
+    events.configure([])
+
+
+def test_events_carry_run_id_and_respect_level(sink) -> None:
+    with events.run_context() as run_id:
+        events.emit("retrieved", documents=4)
+        events.emit("doc_graded", events.DEBUG, index=0, relevant=True)
+    events.flush()
+
+    assert [r["event"] for r in sink.records] == ["run_start", "retrieved", "run_end"]
+    assert {r["run_id"] for r in sink.records} == {run_id}
+    assert sink.records[1]["documents"] == 4
+
+
+def test_traced_node_emits_start_and_end(sink) -> None:
+    def retrieve(state):
+        return {"documents": []}
+
+    assert events.traced(retrieve)({}) == {"documents": []}
+    events.flush()
+
+    assert [(r["event"], r["node"]) for r in sink.records] == [
+        ("node_start", "retrieve"), ("node_end", "retrieve")]
+
+
+def test_traced_node_error_survives_level_filter() -> None:
+    sink = ListSink()
+    events.configure([sink], level=events.WARNING)
+
+    def generate(state):
+        raise RuntimeError("boom")
+
+    try:
+        with pytest.raises(RuntimeError):
+            events.traced(generate)({})
+        events.flush()
+    finally:
+        events.configure([])
+
+    assert [(r["event"], r["level"], r["node"]) for r in sink.records] == [
+        ("node_error", "error", "generate")]
+
+
+def test_disabled_emitter_records_nothing() -> None:
+    sink = ListSink()
+    events.configure([sink])
+    events.configure([])
+    events.emit("retrieved", events.ERROR)
+    events.flush()
+    assert sink.records == []
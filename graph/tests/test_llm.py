@@ -0,0 +1,103 @@
+import pytest
+from langchain_core.runnables import RunnableLambda
+from pydantic import BaseModel, ValidationError
+
+from graph import llm, metrics
+
+
+class Verdict(BaseModel):
+    verdict: str
+
+
+class FakeChat:
+    """Small tier emits output that fails validation; large tier parses."""
+
+    def __init__(self, tier: str) -> None:
+        self.tier = tier
+
+    def with_structured_output(self, schema):
+        if self.tier == "small":
+            return RunnableLambda(lambda _: schema.model_validate({}))
+        return RunnableLambda(lambda _: schema(verdict="useful"))
+
+
+@pytest.fixture
+def fake_llms(monkeypatch):
+    def get_chat_llm(role, temperature=0.0, max_output_tokens=None, tier=None):
+        return FakeChat(tier or llm.role_config(role).tier)
+
+    monkeypatch.setattr(llm, "get_chat_llm", get_chat_llm)
+    monkeypatch.setenv("LLM_PROVIDER", "ollama")
+    monkeypatch.setenv("OLLAMA_SMALL_MODEL", "small-model")
+    monkeypatch.setenv("OLLAMA_LARGE_MODEL", "large-model")
+    metrics.reset()
+    yield
+    metrics.reset()
+
+
+def test_role_config_env_overrides(monkeypatch) -> None:
+    assert llm.role_config("router") == llm.ROLE_DEFAULTS["router"]
+    monkeypatch.setenv("LLM_ROUTER_TIER", "large")
+    monkeypatch.setenv("LLM_ROUTER_MAX_TOKENS", "80")
+    monkeypatch.setenv("LLM_ROUTER_TIMEOUT_S", "5")
+    assert llm.role_config("router") == llm.RoleConfig("large", 80, 5.0)
+
+
+def test_invalid_small_output_escalates_to_large(fake_llms) -> None:
+    chain = llm.get_structured_llm("answer_grader", Verdict)
+    assert chain.invoke({}) == Verdict(verdict="useful")
+    assert metrics.snapshot()["answer_grader"]["escalations"] == 1
+
+
+def test_no_cascade_when_both_tiers_share_a_model(fake_llms, monkeypatch) -> None:
+    monkeypatch.setenv("OLLAMA_LARGE_MODEL", "small-model")
+    with pytest.raises(ValidationError):
+        llm.get_structured_llm("answer_grader", Verdict).invoke({})
+    assert "answer_grader" not in metrics.snapshot()
+
+
+def test_role_clients_share_one_pool_with_per_request_timeouts(monkeypatch) -> None:
+    import httpx
+
+    host = "http://pool-test:11434"
+    shared, shared_async = llm._shared_ollama_clients(host)
+    fast, fast_async = llm._role_ollama_clients(host, 5.0)
+    slow, _ = llm._role_ollama_clients(host, 60.0)
+    assert fast._client is slow._client is shared._client
+    assert fast_async._client is shared_async._client
+
+    timeouts = []
+
+    def request(method, url, **kwargs):
+        timeouts.append(kwargs.get("timeout"))
+        return httpx.Response(200, json={"model": "m", "response": ""},
+                              request=httpx.Request(method, host + url))
+
+    monkeypatch.setattr(shared._client, "request", request)
+    fast.generate(model="m")
+    slow.generate(model="m")
+    assert timeouts == [5.0, 60.0]
+
+
+def test_warm_ollama_models_loads_each_model_once(monkeypatch) -> None:
+    class FakeClient:
+        def __init__(self) -> None:
+            self.calls = []
+
+        def generate(self, **kwargs):
+            self.calls.append(kwargs)
+
+    client = FakeClient()
+    monkeypatch.setattr(llm, "_shared_ollama_clients", lambda host: (client, None))
+    monkeypatch.setenv("OLLAMA_SMALL_MODEL", "small-model")
+    monkeypatch.setenv("OLLAMA_LARGE_MODEL", "large-model")
+
+    assert llm.warm_ollama_models() == ["large-model", "small-model"]
+    assert client.calls == [
+        {"model": m, "keep_alive": llm.OLLAMA_KEEP_ALIVE}
+        for m in ("large-model", "small-model")]
+
+    client.calls.clear()
+    monkeypatch.setenv("OLLAMA_LARGE_MODEL", "small-model")
+    assert llm.warm_ollama_models() == ["small-model"]
+    assert len(client.calls) == 1
@@ -0,0 +1,24 @@
+from langchain_core.documents import Document
+
+from rerank import BM25Reranker, rerank
+
+DOCS = [Document(page_content=t) for t in [
+    "pizza dough recipe",
+    "agent memory is long-term memory stored in a vector store",
+    "short-term memory in agents uses in-context learning",
+    "the weather today",
+]]
+
+
+def test_bm25_orders_by_lexical_match() -> None:
+    top = rerank(BM25Reranker(), "What is agent memory?", DOCS, top_n=2)
+    assert [d.page_content for d in top] == [DOCS[1].page_content, DOCS[2].page_content]
+
+
+def test_empty_query_keeps_retrieval_order() -> None:
+    assert rerank(BM25Reranker(), "?!", DOCS, top_n=3) == DOCS[:3]
+
+
+def test_empty_docs() -> None:
+    assert rerank(BM25Reranker(), "agent memory", [], top_n=4) == []
+    assert BM25Reranker().scores("agent memory", []).shape == (0,)
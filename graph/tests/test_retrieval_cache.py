@@ -0,0 +1,122 @@
+import time
+import uuid
+
+import pytest
+from langchain_chroma import Chroma
+from langchain_core.documents import Document
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from graph import metrics
+from chunking import assign_chunk_ids
+from retrieval_cache import (
+    CachedRetriever,
+    QueryCache,
+    bump_collection_version,
+    content_fingerprint,
+)
+
+
+class CountingEmbedding(DeterministicFakeEmbedding):
+    calls: int = 0
+
+    def embed_query(self, text: str):
+        self.calls += 1
+        return super().embed_query(text)
+
+
+@pytest.fixture
+def retriever(tmp_path):
+    embeddings = CountingEmbedding(size=16)
+    store = Chroma.from_documents(
+        [Document(page_content=f"doc {i} about agent memory", metadata={"source": "s"})
+         for i in range(10)],
+        embedding=embeddings, collection_name=f"test-{uuid.uuid4().hex}")
+    bump_collection_version(tmp_path, "v1")
+    metrics.reset()
+    yield CachedRetriever(vectorstore=store, persist_directory=str(tmp_path), k=3,
+                          cache=QueryCache(sqlite_path=None))
+    store.delete_collection()
+    metrics.reset()
+
+
+def test_hits_after_query_normalisation(retriever) -> None:
+    first = retriever.invoke("What is agent memory?")
+    again = retriever.invoke("  what is AGENT   memory ")
+    assert [d.id for d in again] == [d.id for d in first]
+    assert retriever.vectorstore.embeddings.calls == 1
+    assert metrics.cache_snapshot()["query_results"]["hits"] == 1
+
+
+def test_version_bump_invalidates_ids_but_keeps_embeddings(retriever, tmp_path) -> None:
+    retriever.invoke("What is agent memory?")
+    time.sleep(0.01)  # the version file is re-read on an mtime change
+    bump_collection_version(tmp_path, "v2")
+    retriever.invoke("What is agent memory?")
+
+    stats = metrics.cache_snapshot()
+    assert stats["query_results"] == {"hits": 0, "misses": 2, "hit_rate": 0.0}
+    assert stats["query_embedding"]["hits"] == 1
+    assert retriever.vectorstore.embeddings.calls == 1
+
+
+def test_entries_expire_after_ttl() -> None:
+    cache = QueryCache(ttl_s=0.05, sqlite_path=None)
+    cache.put_ids("q", "v1", 3, ["a"])
+    assert cache.get_ids("q", "v1", 3) == ["a"]
+    time.sleep(0.1)
+    assert cache.get_ids("q", "v1", 3) is None
+
+
+def test_sqlite_layer_is_shared_and_capped(tmp_path) -> None:
+    path = str(tmp_path / "cache.db")
+    writer = QueryCache(sqlite_path=path, sqlite_max_rows=3)
+    reader = QueryCache(sqlite_path=path)
+    writer.put_embedding("q", "model", [0.5, 0.25])
+    assert reader.get_embedding("q", "model") == [0.5, 0.25]
+
+    for i in range(10):
+        writer.put_ids(f"q{i}", "v1", 3, [str(i)])
+    rows = writer._db.execute("SELECT COUNT(*) FROM query_cache").fetchone()[0]
+    assert rows == 3
+    assert reader.get_ids("q9", "v1", 3) == ["9"]
+
+
+def _reindex(name: str, docs, embeddings) -> Chroma:
+    # A fresh index of the same content, as another process's ingestion would build
+    Chroma(collection_name=name, embedding_function=embeddings).delete_collection()
+    return Chroma.from_documents(
+        [Document(page_content=d.page_content, metadata=d.metadata, id=d.id) for d in docs],
+        embedding=embeddings, collection_name=name)
+
+
+def test_deterministic_ids_keep_results_valid_across_reingestion(tmp_path) -> None:
+    docs = assign_chunk_ids([Document(page_content=f"doc {i} about agent memory",
+                                      metadata={"source": "s"}) for i in range(10)])
+    version = bump_collection_version(tmp_path, content_fingerprint(docs))
+    path = str(tmp_path / "cache.db")
+    name = f"test-{uuid.uuid4().hex}"
+    metrics.reset()
+
+    first = CachedRetriever(
+        vectorstore=_reindex(name, docs, CountingEmbedding(size=16)),
+        persist_directory=str(tmp_path), k=3, cache=QueryCache(sqlite_path=path))
+    expected = first.invoke("What is agent memory?")
+
+    again = assign_chunk_ids([Document(page_content=d.page_content, metadata=d.metadata)
+                              for d in docs])
+    assert content_fingerprint(again) == version
+    second = CachedRetriever(
+        vectorstore=_reindex(name, again, CountingEmbedding(size=16)),
+        persist_directory=str(tmp_path), k=3, cache=QueryCache(sqlite_path=path))
+    assert [d.id for d in second.invoke("What is agent memory?")] == [d.id for d in expected]
+    assert second.vectorstore.embeddings.calls == 0
+    assert metrics.cache_snapshot()["query_results"]["hits"] == 1
+    second.vectorstore.delete_collection()
+
+
+def test_stale_ids_count_as_a_miss(retriever) -> None:
+    first = retriever.invoke("What is agent memory?")
+    retriever.vectorstore.delete([first[0].id])
+    retriever.invoke("What is agent memory?")
+    assert metrics.cache_snapshot()["query_results"] == {
+        "hits": 0, "misses": 2, "hit_rate": 0.0}
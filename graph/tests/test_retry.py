@@ -0,0 +1,49 @@
+import time
+
+from graph.consts import WEBSEARCH
+from graph.retry import GIVE_UP, REGENERATE, choose_retry_strategy
+
+
+def test_gives_up_when_budget_spent() -> None:
+    state = {"max_retries": 1, "deadline": None}
+    assert choose_retry_strategy(state, "not_supported", 2) == GIVE_UP
+
+
+def test_zero_retries_disables_retry() -> None:
+    state = {"max_retries": 0, "deadline": None}
+    assert choose_retry_strategy(state, "not_supported", 1) == GIVE_UP
+
+
+def test_not_supported_regenerates_then_escalates() -> None:
+    state = {"max_retries": 3, "deadline": None}
+    assert choose_retry_strategy(state, "not_supported", 1) == REGENERATE
+
+    state["retry_strategy"] = REGENERATE
+    assert choose_retry_strategy(state, "not_supported", 2) == WEBSEARCH
+
+
+def test_not_useful_goes_to_web_search() -> None:
+    state = {"max_retries": 3, "deadline": None}
+    assert choose_retry_strategy(state, "not_useful", 1) == WEBSEARCH
+
+
+def test_no_second_web_search() -> None:
+    state = {"max_retries": 3, "deadline": None,
+             "retry_strategy": WEBSEARCH, "web_searched": True}
+    assert choose_retry_strategy(state, "not_useful", 2) == REGENERATE
+
+    state["retry_strategy"] = REGENERATE
+    assert choose_retry_strategy(state, "not_supported", 3) == REGENERATE
+
+    state["deadline"] = time.time() + 1
+    assert choose_retry_strategy(state, "not_useful", 3) == GIVE_UP
+
+
+def test_strategy_fits_remaining_time() -> None:
+    state = {"max_retries": 3, "retry_strategy": REGENERATE,
+             "deadline": time.time() + 5}
+    # Not enough time left for web search, but enough to regenerate
+    assert choose_retry_strategy(state, "not_supported", 2) == REGENERATE
+
+    state["deadline"] = time.time() + 1
+    assert choose_retry_strategy(state, "not_supported", 2) == GIVE_UP
@@ -1,52 +1,106 @@
 import asyncio
 import os
+from dataclasses import replace
 from pathlib import Path
 import ssl
 from typing import Any, Dict, List
 import certifi
 from dotenv import load_dotenv
 # from langchain_chroma import Chroma
-from langchain_classic.text_splitter import RecursiveCharacterTextSplitter
 from langchain_core.documents import Document
-from langchain_google_genai import GoogleGenerativeAIEmbeddings
 from langchain_pinecone import PineconeVectorStore
 from langchain_tavily import TavilyCrawl, TavilyExtract, TavilyMap
 from langchain_chroma import Chroma
-from langchain_community.document_loaders import WebBaseLoader
+
+from chunking import (
+    SOURCE_URLS,
+    ChunkConfig,
+    assign_chunk_ids,
+    chunk_documents,
+    load_documents,
+)
+from docstore import MmapDocStore, write_docstore
+from graph.llm import get_embeddings
+from rerank import RERANK_CANDIDATES, RERANK_TOP_N, get_reranker
+from retrieval_cache import (
+    RETRIEVAL_CACHE_ENABLED,
+    CachedRetriever,
+    bump_collection_version,
+    content_fingerprint,
+)
 
 load_dotenv()
 
-urls = [
-    "https://lilianweng.github.io/posts/2023-06-23-agent/",
-    "https://lilianweng.github.io/posts/2023-03-15-prompt-engineering/",
-    "https://lilianweng.github.io/posts/2023-10-25-adv-attack-llm/",
-]
+urls = SOURCE_URLS
 
+# RETRIEVAL_MODE=parent: small-to-big retrieval. Small child chunks are
+# indexed in Chroma, their parent sections go to a memory-mapped docstore,
+# and retrieve expands matched children into merged parent spans.
+RETRIEVAL_MODE = os.getenv("RETRIEVAL_MODE", "chunk").lower()
+PERSIST_DIR = "./.chroma"
+DOCSTORE_DIR = "./.docstore"
+# Children retrieved per question in parent mode (merged into fewer spans)
+PARENT_CHILD_K = int(os.getenv("PARENT_CHILD_K", "8"))
 
-docs = [WebBaseLoader(url).load() for url in urls]
-docs_list = [item for sublist in docs for item in sublist]
+# CHUNK_STRATEGY / CHUNK_SIZE / CHUNK_OVERLAP / ... select the chunking
+# strategy (see chunking.py); the default matches the original 250/0 token split.
+chunk_config = ChunkConfig.from_env()
+if RETRIEVAL_MODE == "parent":
+    chunk_config = replace(chunk_config, strategy="parent_document")
 
-text_splitter = RecursiveCharacterTextSplitter.from_tiktoken_encoder(
-    chunk_size=250, chunk_overlap=0
-)
+docs_list = load_documents(
+    urls, keep_html=chunk_config.strategy == "html_heading")
+
+doc_splits, parent_docs = chunk_documents(docs_list, chunk_config)
+# Stable ids: cached result id lists stay valid across re-ingestion
+assign_chunk_ids(doc_splits)
 
-doc_splits = text_splitter.split_documents(docs_list)
+embedding_function = get_embeddings()
 
-embedding_function = GoogleGenerativeAIEmbeddings(
-    google_api_key=os.environ["GEMINI_API_KEY"],
-    model=os.environ.get("EMBEDDING_MODEL", "text-embedding-004"),
-    chunk_size=50,
-    retry_min_seconds=10)
+# Content-addressed collection: every distinct index (chunk config, sources)
+# gets its own collection, built once and never modified or deleted while
+# another process may still be serving from it. Unchanged content skips the
+# re-index (and its embedding calls) entirely.
+fingerprint = content_fingerprint(doc_splits)
+COLLECTION = f"rag-chroma-{fingerprint[:16]}"
 
-vectorstore = Chroma.from_documents(
-    documents=doc_splits,
-    collection_name="rag-chroma",
-    embedding=embedding_function,
-    persist_directory="./.chroma",
+vectorstore = Chroma(
+    collection_name=COLLECTION,
+    persist_directory=PERSIST_DIR,
+    embedding_function=embedding_function,
 )
+if vectorstore._collection.count() != len(doc_splits):
+    # Upserts by chunk id, so finishing an interrupted build is idempotent
+    vectorstore = Chroma.from_documents(
+        documents=doc_splits,
+        collection_name=COLLECTION,
+        embedding=embedding_function,
+        persist_directory=PERSIST_DIR,
+    )
+# Switch the shared version only once the collection is complete
+bump_collection_version(PERSIST_DIR, fingerprint)
+
+docstore = None
+if RETRIEVAL_MODE == "parent":
+    write_docstore(DOCSTORE_DIR, parent_docs)
+    docstore = MmapDocStore(DOCSTORE_DIR)
 
-retriever = Chroma(
-    collection_name="rag-chroma",
-    persist_directory="./.chroma",
+retrieval_store = Chroma(
+    collection_name=COLLECTION,
+    persist_directory=PERSIST_DIR,
     embedding_function=embedding_function,
-).as_retriever()
+)
+retrieval_k = PARENT_CHILD_K if docstore is not None else 4
+
+# RERANK=bm25|cross_encoder: over-fetch RERANK_CANDIDATES and let the local
+# reranker pick the `rerank_top_n` that go on to grading (see rerank.py)
+reranker = get_reranker()
+rerank_top_n = retrieval_k if docstore is not None else RERANK_TOP_N
+if reranker is not None:
+    retrieval_k = max(RERANK_CANDIDATES, rerank_top_n)
+
+if RETRIEVAL_CACHE_ENABLED:
+    retriever = CachedRetriever(
+        vectorstore=retrieval_store, persist_directory=PERSIST_DIR, k=retrieval_k)
+else:
+    retriever = retrieval_store.as_retriever(search_kwargs={"k": retrieval_k})
@@ -4,6 +4,8 @@ CLI entrypoint for the Agentic RAG graph.
 Examples:
   python -m main --question "How do I make pizza?"
   python -m main --question "What is agent memory?" --retry-count 2 --json
+  python -m main --question "What is agent memory?" --retry-count 2 --deadline-ms 20000
+  EVENT_LOG=jsonl EVENT_LOG_PATH=events.jsonl python -m main --question "What is agent memory?"
 """
 
 from __future__ import annotations
@@ -18,7 +20,9 @@ from typing import Any, Dict, Optional
 
 from dotenv import load_dotenv
 
+from graph import events, metrics
 from graph.graph import app
+from graph.llm import warm_ollama_models
 
 
 LOG = logging.getLogger("agentic_rag")
@@ -28,6 +32,7 @@ LOG = logging.getLogger("agentic_rag")
 class RunConfig:
     question: str
     retry_count: int
+    deadline_ms: int
     as_json: bool
     verbose: bool
     dotenv: bool
@@ -56,6 +61,16 @@ def parse_args(argv: Optional[list[str]] = None) -> RunConfig:
         default=0,
         help="How many times the graph is allowed to retry (0 disables retries).",
     )
+    p.add_argument(
+        "--deadline-ms",
+        type=int,
+        default=0,
+        help=(
+            "Per-request deadline in ms (0 disables). Retries that would not fit are "
+            "skipped, in-flight LLM/search calls are cancelled when it passes, and "
+            "the best partial answer is returned."
+        ),
+    )
     p.add_argument(
         "--json",
         dest="as_json",
@@ -78,10 +93,13 @@ def parse_args(argv: Optional[list[str]] = None) -> RunConfig:
 
     if args.retry_count < 0:
         p.error("--retry-count must be >= 0")
+    if args.deadline_ms < 0:
+        p.error("--deadline-ms must be >= 0")
 
     return RunConfig(
         question=args.question.strip(),
         retry_count=args.retry_count,
+        deadline_ms=args.deadline_ms,
         as_json=args.as_json,
         verbose=args.verbose,
         dotenv=args.dotenv,
@@ -119,8 +137,21 @@ def validate_env() -> None:
 
 
 def run_once(cfg: RunConfig) -> Dict[str, Any]:
-    payload = {"question": cfg.question, "retry_count": cfg.retry_count}
-    return app.invoke(payload)
+    deadline = None
+    if cfg.deadline_ms:
+        deadline = time.time() + cfg.deadline_ms / 1000.0
+    payload = {
+        "question": cfg.question,
+        "max_retries": cfg.retry_count,
+        "retry_count": 0,
+        "deadline": deadline,
+        "attempts": [],
+        "partial": False,
+    }
+    # Every graph event of this run carries the same run_id (graph.events)
+    with events.run_context() as run_id:
+        LOG.debug("Run id: %s", run_id)
+        return app.invoke(payload)
 
 
 def main(argv: Optional[list[str]] = None) -> int:
@@ -132,21 +163,45 @@ def main(argv: Optional[list[str]] = None) -> int:
 
     try:
         validate_env()
+        if (os.getenv("LLM_PROVIDER", "").lower() == "ollama"
+                and os.getenv("OLLAMA_PRELOAD", "on").lower() not in ("0", "false", "off")):
+            LOG.info("Preloaded Ollama models: %s", ", ".join(warm_ollama_models()))
         LOG.info("Running Agentic RAG")
         LOG.debug("Question: %s", cfg.question)
 
         t0 = time.perf_counter()
         result = run_once(cfg)
         dt_ms = (time.perf_counter() - t0) * 1000.0
+        events.flush()  # the run's events before the answer and summary
 
         if cfg.as_json:
             print(json.dumps(result, ensure_ascii=False, indent=2, default=str))
         else:
             answer = result.get("generation")
             if not answer:
+                if result.get("partial"):
+                    raise RuntimeError(
+                        "Deadline exceeded before any answer was generated.")
                 raise RuntimeError("No 'generation' field found in result.")
             print(answer)
 
+        if result.get("partial"):
+            LOG.warning(
+                "Deadline exceeded: returned the best partial (ungraded) answer.")
+
+        for attempt in result.get("attempts", []):
+            LOG.debug("Attempt: %s", attempt)
+        for role, stats in metrics.snapshot().items():
+            LOG.info(
+                "LLM %s: %d calls, %.1f ms mean, %d in / %d out tokens, "
+                "%d escalations, $%.6f",
+                role, stats["calls"], stats["mean_latency_ms"],
+                stats["input_tokens"], stats["output_tokens"],
+                stats["escalations"], stats["cost_usd"],
+            )
+        for cache, stats in metrics.cache_snapshot().items():
+            LOG.info("Cache %s: %d hits, %d misses (%.0f%% hit rate)",
+                     cache, stats["hits"], stats["misses"], stats["hit_rate"] * 100)
         LOG.info("Done in %.1f ms", dt_ms)
         return 0
 
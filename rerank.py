@@ -0,0 +1,104 @@
+"""
+Optional rerank stage between retrieval and grading.
+
+With RERANK=bm25|cross_encoder the retriever over-fetches RERANK_CANDIDATES
+chunks (embedding order) and only the best RERANK_TOP_N after reranking go
+on to the LLM grader and generation. Both scorers run locally on CPU:
+
+  bm25           lexical BM25 over the candidate set, vectorised with numpy
+  cross_encoder  sentence-transformers CrossEncoder (RERANK_MODEL), scored in
+                 batches of RERANK_BATCH_SIZE
+                 Requires: pip install sentence-transformers
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import threading
+from collections import Counter
+from typing import List, Optional
+
+import numpy as np
+from langchain_core.documents import Document
+
+RERANK = os.getenv("RERANK", "off").lower()
+RERANK_CANDIDATES = int(os.getenv("RERANK_CANDIDATES", "30"))
+RERANK_TOP_N = int(os.getenv("RERANK_TOP_N", "4"))
+RERANK_MODEL = os.getenv("RERANK_MODEL", "cross-encoder/ms-marco-MiniLM-L-6-v2")
+RERANK_BATCH_SIZE = int(os.getenv("RERANK_BATCH_SIZE", "32"))
+
+_TOKEN = re.compile(r"\w+")
+
+
+def _tokenize(text: str) -> List[str]:
+    return _TOKEN.findall(text.lower())
+
+
+class BM25Reranker:
+    def __init__(self, k1: float = 1.5, b: float = 0.75) -> None:
+        self.k1 = k1
+        self.b = b
+
+    def scores(self, query: str, docs: List[Document]) -> np.ndarray:
+        terms = sorted(set(_tokenize(query)))
+        if not terms or not docs:
+            return np.zeros(len(docs))
+        col = {t: j for j, t in enumerate(terms)}
+        tf = np.zeros((len(docs), len(terms)), dtype=np.float32)
+        lengths = np.empty(len(docs), dtype=np.float32)
+        for i, d in enumerate(docs):
+            tokens = _tokenize(d.page_content)
+            lengths[i] = len(tokens)
+            for t, n in Counter(tokens).items():
+                j = col.get(t)
+                if j is not None:
+                    tf[i, j] = n
+
+        # IDF over the candidate set (the only corpus the reranker sees)
+        df = (tf > 0).sum(axis=0)
+        idf = np.log1p((len(docs) - df + 0.5) / (df + 0.5))
+        norm = self.k1 * (1 - self.b + self.b * lengths / max(lengths.mean(), 1.0))
+        return ((tf * (self.k1 + 1)) / (tf + norm[:, None])) @ idf
+
+
+class CrossEncoderReranker:
+    def __init__(self, model_name: str = RERANK_MODEL, batch_size: int = RERANK_BATCH_SIZE) -> None:
+        from sentence_transformers import CrossEncoder
+
+        self.model = CrossEncoder(model_name, device="cpu")
+        self.batch_size = batch_size
+
+    def scores(self, query: str, docs: List[Document]) -> np.ndarray:
+        if not docs:
+            return np.zeros(0)
+        pairs = [(query, d.page_content) for d in docs]
+        return np.asarray(self.model.predict(
+            pairs, batch_size=self.batch_size, show_progress_bar=False))
+
+
+def rerank(scorer, query: str, docs: List[Document], top_n: int = RERANK_TOP_N) -> List[Document]:
+    """The `top_n` docs by descending score (ties keep retrieval order)."""
+    scores = scorer.scores(query, docs)
+    order = np.argsort(-scores, kind="stable")[:top_n]
+    return [docs[i] for i in order]
+
+
+_reranker = None
+_reranker_lock = threading.Lock()
+
+
+def get_reranker() -> Optional[object]:
+    """The configured scorer (loaded once), or None when RERANK=off."""
+    global _reranker
+    if RERANK == "off":
+        return None
+    with _reranker_lock:
+        if _reranker is None:
+            if RERANK == "bm25":
+                _reranker = BM25Reranker()
+            elif RERANK == "cross_encoder":
+                _reranker = CrossEncoderReranker()
+            else:
+                raise ValueError(f"Unknown RERANK: {RERANK}")
+    return _reranker
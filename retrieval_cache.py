@@ -0,0 +1,247 @@
+"""
+Query-result cache in front of the Chroma retriever.
+
+Two entries are cached per normalised query:
+  - its embedding, keyed on the embedding model (saves the Gemini round trip)
+  - the top-k result ids, keyed on the collection version and k
+
+Ingestion bumps the collection version (bump_collection_version), which
+invalidates every cached result set while keeping the embeddings. Entries
+live in an in-process LRU with a TTL; RETRIEVAL_CACHE_SQLITE=<path> adds a
+SQLite layer shared by every process on the host, pruned of expired rows and
+capped at RETRIEVAL_CACHE_SQLITE_ROWS (oldest first). Hits and misses are
+recorded in graph.metrics under "query_embedding" and "query_results".
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import uuid
+from array import array
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Iterable, List, Optional, Tuple
+
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+from pydantic import PrivateAttr
+
+from graph.metrics import record_cache
+
+RETRIEVAL_CACHE_ENABLED = os.getenv("RETRIEVAL_CACHE", "on").lower() in (
+    "1", "true", "on")
+RETRIEVAL_CACHE_SIZE = int(os.getenv("RETRIEVAL_CACHE_SIZE", "1024"))
+RETRIEVAL_CACHE_TTL_S = float(os.getenv("RETRIEVAL_CACHE_TTL_S", "3600"))
+RETRIEVAL_CACHE_SQLITE = os.getenv("RETRIEVAL_CACHE_SQLITE")
+RETRIEVAL_CACHE_SQLITE_ROWS = int(os.getenv("RETRIEVAL_CACHE_SQLITE_ROWS", "100000"))
+
+VERSION_FILE = "collection_version"
+
+
+def normalize_query(query: str) -> str:
+    return re.sub(r"\s+", " ", query).strip().lower().rstrip("?!. ")
+
+
+def content_fingerprint(docs: Iterable[Document]) -> str:
+    # Ids are part of the fingerprint: cached results are lists of ids
+    h = hashlib.sha1()
+    for d in docs:
+        h.update((d.id or "").encode("utf-8"))
+        h.update(b"\0")
+        h.update(d.page_content.encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def bump_collection_version(
+    persist_directory: str | Path, fingerprint: Optional[str] = None
+) -> str:
+    """
+    Called by ingestion after (re)indexing; invalidates cached results.
+    With a `fingerprint` of the indexed ids and content (content_fingerprint)
+    the version only changes when either does, so re-running an identical
+    ingestion with deterministic ids (chunking.assign_chunk_ids) keeps cached
+    results valid across processes.
+    """
+    version = fingerprint or uuid.uuid4().hex
+    path = Path(persist_directory) / VERSION_FILE
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(version, encoding="utf-8")
+    os.replace(tmp, path)
+    return version
+
+
+class _VersionReader:
+    # Re-reads the version file only when its mtime changes, so ingestion in
+    # another process is picked up without a file read per query.
+    def __init__(self, persist_directory: str | Path) -> None:
+        self.path = Path(persist_directory) / VERSION_FILE
+        self._mtime_ns: Optional[int] = None
+        self._version = ""
+
+    def get(self) -> str:
+        try:
+            mtime_ns = self.path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return ""
+        if mtime_ns != self._mtime_ns:
+            self._version = self.path.read_text(encoding="utf-8").strip()
+            self._mtime_ns = mtime_ns
+        return self._version
+
+
+class QueryCache:
+    """LRU + TTL cache of query embeddings and result ids, optionally backed by SQLite."""
+
+    def __init__(
+        self,
+        max_entries: int = RETRIEVAL_CACHE_SIZE,
+        ttl_s: float = RETRIEVAL_CACHE_TTL_S,
+        sqlite_path: Optional[str] = RETRIEVAL_CACHE_SQLITE,
+        sqlite_max_rows: int = RETRIEVAL_CACHE_SQLITE_ROWS,
+    ) -> None:
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self.sqlite_max_rows = sqlite_max_rows
+        self._lru: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        if sqlite_path:
+            self._db = sqlite3.connect(sqlite_path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS query_cache "
+                "(key TEXT PRIMARY KEY, value BLOB, created REAL)")
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS query_cache_created ON query_cache (created)")
+            self._prune(time.time())
+            self._db.commit()
+
+    def _get(self, key: str) -> Optional[Any]:
+        now = time.time()
+        with self._lock:
+            entry = self._lru.get(key)
+            if entry is not None:
+                if now - entry[0] <= self.ttl_s:
+                    self._lru.move_to_end(key)
+                    return entry[1]
+                del self._lru[key]
+            if self._db is None:
+                return None
+            row = self._db.execute(
+                "SELECT value, created FROM query_cache WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None or now - row[1] > self.ttl_s:
+            return None
+        value = self._decode(key, row[0])
+        self._put_memory(key, value, row[1])
+        return value
+
+    def _put(self, key: str, value: Any) -> None:
+        created = time.time()
+        self._put_memory(key, value, created)
+        if self._db is not None:
+            with self._lock:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO query_cache VALUES (?, ?, ?)",
+                    (key, self._encode(key, value), created))
+                self._prune(created)
+                self._db.commit()
+
+    def _prune(self, now: float) -> None:
+        # TTL is only checked on read; without this the shared DB never shrinks.
+        # Runs on misses only (puts), next to an embedding call or a search.
+        self._db.execute(
+            "DELETE FROM query_cache WHERE created < ?", (now - self.ttl_s,))
+        self._db.execute(
+            "DELETE FROM query_cache WHERE key IN (SELECT key FROM query_cache "
+            "ORDER BY created DESC LIMIT -1 OFFSET ?)", (self.sqlite_max_rows,))
+
+    def _put_memory(self, key: str, value: Any, created: float) -> None:
+        with self._lock:
+            self._lru[key] = (created, value)
+            self._lru.move_to_end(key)
+            while len(self._lru) > self.max_entries:
+                self._lru.popitem(last=False)
+
+    @staticmethod
+    def _encode(key: str, value: Any) -> bytes:
+        if key.startswith("emb:"):
+            return array("f", value).tobytes()  # float32, 4 bytes per dim
+        return json.dumps(value).encode("utf-8")
+
+    @staticmethod
+    def _decode(key: str, blob: bytes) -> Any:
+        if key.startswith("emb:"):
+            vec = array("f")
+            vec.frombytes(blob)
+            return vec.tolist()
+        return json.loads(blob)
+
+    def get_embedding(self, query: str, model: str) -> Optional[List[float]]:
+        return self._get(f"emb:{model}:{query}")
+
+    def put_embedding(self, query: str, model: str, embedding: List[float]) -> None:
+        self._put(f"emb:{model}:{query}", embedding)
+
+    def get_ids(self, query: str, version: str, k: int) -> Optional[List[str]]:
+        return self._get(f"ids:{version}:{k}:{query}")
+
+    def put_ids(self, query: str, version: str, k: int, ids: List[str]) -> None:
+        self._put(f"ids:{version}:{k}:{query}", ids)
+
+
+class CachedRetriever(BaseRetriever):
+    """Drop-in for vectorstore.as_retriever() that consults a QueryCache first."""
+
+    vectorstore: Any
+    persist_directory: str
+    k: int = 4
+    cache: Any = None
+    _versions: _VersionReader = PrivateAttr()
+
+    def model_post_init(self, __context: Any) -> None:
+        if self.cache is None:
+            self.cache = QueryCache()
+        self._versions = _VersionReader(self.persist_directory)
+
+    def _embedding_model(self) -> str:
+        embeddings = self.vectorstore.embeddings
+        return getattr(embeddings, "model", type(embeddings).__name__)
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        key = normalize_query(query)
+        # The collection is part of the version: a process still serving an
+        # older collection must not file its ids under the newer version
+        collection = getattr(self.vectorstore, "_collection_name", "")
+        version = f"{collection}:{self._versions.get()}"
+
+        ids = self.cache.get_ids(key, version, self.k)
+        if ids is not None:
+            by_id = {d.id: d for d in self.vectorstore.get_by_ids(ids)}
+            if len(by_id) == len(ids):
+                record_cache("query_results", True)
+                return [by_id[i] for i in ids]
+            # Ids vanished without a version bump: a miss, fall through to a search
+        record_cache("query_results", False)
+
+        model = self._embedding_model()
+        embedding = self.cache.get_embedding(key, model)
+        record_cache("query_embedding", embedding is not None)
+        if embedding is None:
+            embedding = self.vectorstore.embeddings.embed_query(query)
+            self.cache.put_embedding(key, model, embedding)
+
+        docs = self.vectorstore.similarity_search_by_vector(embedding, k=self.k)
+        self.cache.put_ids(key, version, self.k, [d.id for d in docs])
+        return docs